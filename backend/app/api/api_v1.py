@@ -1,5 +1,6 @@
-from fastapi import APIRouter
-from api.endpoints import basic, ai_chat, legal_advisor
+from fastapi import APIRouter, Depends
+from api.endpoints import basic, ai_chat, legal_advisor, usage
+from core.security import require_api_key
 
 # Main API router
 api_router = APIRouter()
@@ -14,12 +15,21 @@ api_router.include_router(
 api_router.include_router(
     ai_chat.router,
     prefix="/ai",
-    tags=["AI Chat"]
+    tags=["AI Chat"],
+    dependencies=[Depends(require_api_key)]
 )
 
 # Include Bangladesh Legal Advisory endpoints
 api_router.include_router(
     legal_advisor.router,
     prefix="/legal",
-    tags=["🏛️ Bangladesh Legal Advisory"]
+    tags=["🏛️ Bangladesh Legal Advisory"],
+    dependencies=[Depends(require_api_key)]
+)
+
+# Include token usage reports
+api_router.include_router(
+    usage.router,
+    prefix="/usage",
+    tags=["Usage"]
 )
\ No newline at end of file
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, WebSocket
 from fastapi.responses import StreamingResponse # pyright: ignore[reportMissingImports]
+from core.profiling import TimedRoute
 from models.schemas import ChatRequest, ChatResponse, ErrorResponse
 from services.groq_service import groq_service
+from services.chat_socket_service import ChatSocketSession
+from services.token_budget import token_budget
+from services.request_gate import request_gate
+from datetime import datetime
 import json
 import asyncio
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_ai(request: ChatRequest):
@@ -13,9 +18,20 @@ async def chat_with_ai(request: ChatRequest):
     Chat with AI - Get complete response at once
     """
     try:
+        gate = request_gate.check(request.message)
+        if gate["action"] == "canned":
+            return ChatResponse(
+                user_message=request.message,
+                ai_response=gate["response"],
+                model="request-gate",
+                tokens_used=0,
+                timestamp=datetime.now(),
+                status="success"
+            )
+
         # Generate AI response
         result = await groq_service.generate_response(
-            message=request.message,
+            message=request_gate.with_language_hint(request.message, gate["language"]),
             max_tokens=request.max_tokens
         )
         
@@ -27,6 +43,7 @@ async def chat_with_ai(request: ChatRequest):
             ai_response=result["response"],
             model=result["model"],
             tokens_used=result["tokens_used"],
+            timestamp=datetime.now(),
             status="success"
         )
         
@@ -41,9 +58,19 @@ async def chat_with_ai_stream(request: ChatRequest):
     """
     Chat with AI - Get streaming response (typing effect)
     """
+    gate = request_gate.check(request.message)
+
     async def generate_stream():
         try:
-            async for chunk in groq_service.generate_streaming_response(request.message):
+            if gate["action"] == "canned":
+                yield f"data: {json.dumps({'chunk': gate['response'], 'status': 'streaming'})}\n\n"
+                yield f"data: {json.dumps({'chunk': '', 'status': 'completed'})}\n\n"
+                return
+
+            async for chunk in groq_service.generate_streaming_response(
+                request_gate.with_language_hint(request.message, gate["language"]),
+                max_tokens=request.max_tokens
+            ):
                 # Format as Server-Sent Events
                 yield f"data: {json.dumps({'chunk': chunk, 'status': 'streaming'})}\n\n"
             
@@ -62,6 +89,34 @@ async def chat_with_ai_stream(request: ChatRequest):
         }
     )
 
+@router.websocket("/ws")
+async def chat_with_ai_websocket(websocket: WebSocket):
+    """
+    Chat with AI over one WebSocket - multiple concurrent streams, cancel support
+    """
+    await websocket.accept()
+    await ChatSocketSession(websocket).run()
+
+@router.get("/token-budget")
+async def get_token_budget_report():
+    """
+    Learned max_tokens per endpoint with token and latency savings against the fixed budgets
+    """
+    return {
+        "budgets": token_budget.report(),
+        "status": "success"
+    }
+
+@router.get("/gate-stats")
+async def get_request_gate_stats():
+    """
+    How many upstream calls the pre-validation gate avoided, by reason and language
+    """
+    return {
+        **request_gate.stats(),
+        "status": "success"
+    }
+
 @router.get("/models")
 async def get_available_models():
     """
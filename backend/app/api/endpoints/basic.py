@@ -1,7 +1,8 @@
 from fastapi import APIRouter
+from core.profiling import TimedRoute
 from core.config import settings
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.get("/")
 def read_root():
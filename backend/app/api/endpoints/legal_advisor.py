@@ -5,10 +5,14 @@ from models.schemas import (
     LawExplanationRequest, LegalRightsRequest, DocumentRequirementRequest,
     EmergencyLegalRequest, ChatResponse, ErrorResponse
 )
+from core.profiling import TimedRoute, timed
 from services.groq_service import groq_service
+from services.legal_catalog import LEGAL_CATEGORIES
+from services.topic_cache_service import topic_cache
+from services.request_gate import request_gate
 from datetime import datetime
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/legal-advice", response_model=ChatResponse)
 async def get_legal_advice(request: LegalQueryRequest):
@@ -17,25 +21,44 @@ async def get_legal_advice(request: LegalQueryRequest):
     Get legal advice according to Bangladesh law
     """
     try:
+        # Spam, greetings and off-topic chatter never reach the model
+        gate = request_gate.check(request.problem_description)
+        if gate["action"] == "canned":
+            return ChatResponse(
+                user_message=request.problem_description,
+                ai_response=gate["response"],
+                model="request-gate",
+                tokens_used=0,
+                specialization="bangladesh_legal_advisor",
+                timestamp=datetime.now(),
+                status="success"
+            )
+
         # Create detailed prompt with user's problem
-        detailed_prompt = f"""
-        আইনি সমস্যা: {request.problem_description}
-        সমস্যার ধরণ: {request.problem_type}
-        অবস্থান: {request.location}
-        জরুরি মাত্রা: {request.urgency_level}
+        with timed("prompt"):
+            detailed_prompt = f"""
+            আইনি সমস্যা: {request.problem_description}
+            সমস্যার ধরণ: {request.problem_type}
+            অবস্থান: {request.location}
+            জরুরি মাত্রা: {request.urgency_level}
         
-        দয়া করে নিম্নলিখিত format এ উত্তর দিন:
+            দয়া করে নিম্নলিখিত format এ উত্তর দিন:
         
-        ১. আইনি বিশ্লেষণ:
-        ২. আপনার অধিকার:
-        ৩. পরবর্তী পদক্ষেপ:
-        ৪. প্রয়োজনীয় কাগজপত্র:
-        ৫. কোথায় যেতে হবে:
-        ৬. আনুমানিক খরচ:
-        ৭. গুরুত্বপূর্ণ সতর্কতা:
-        """
+            ১. আইনি বিশ্লেষণ:
+            ২. আপনার অধিকার:
+            ৩. পরবর্তী পদক্ষেপ:
+            ৪. প্রয়োজনীয় কাগজপত্র:
+            ৫. কোথায় যেতে হবে:
+            ৬. আনুমানিক খরচ:
+            ৭. গুরুত্বপূর্ণ সতর্কতা:
+            """
+            detailed_prompt = request_gate.with_language_hint(detailed_prompt, gate["language"])
         
-        result = await groq_service.generate_legal_advice(detailed_prompt, max_tokens=1200)
+        result = await groq_service.generate_legal_advice(
+            detailed_prompt,
+            max_tokens=1200,
+            budget_key=f"legal_advice:{request.problem_type}"
+        )
         
         if result["status"] == "error":
             raise HTTPException(status_code=500, detail=result["error"])
@@ -63,7 +86,7 @@ async def get_legal_procedure(request: LegalProcedureRequest):
     Step-by-step legal procedure for specific case types
     """
     try:
-        result = await groq_service.get_legal_procedures(request.case_type)
+        result = await topic_cache.get_or_generate("legal_procedure", request.case_type)
         
         if result["status"] == "error":
             raise HTTPException(status_code=500, detail=result["error"])
@@ -89,7 +112,7 @@ async def explain_bangladesh_law(request: LawExplanationRequest):
     Simple explanation of specific Bangladesh laws
     """
     try:
-        result = await groq_service.explain_bangladesh_law(request.law_topic)
+        result = await topic_cache.get_or_generate("explain_law", request.law_topic)
         
         if result["status"] == "error":
             raise HTTPException(status_code=500, detail=result["error"])
@@ -141,7 +164,7 @@ async def get_document_requirements(request: DocumentRequirementRequest):
     List of required documents for legal actions
     """
     try:
-        result = await groq_service.get_document_requirements(request.legal_action)
+        result = await topic_cache.get_or_generate("document_requirements", request.legal_action)
         
         if result["status"] == "error":
             raise HTTPException(status_code=500, detail=result["error"])
@@ -195,38 +218,7 @@ async def get_legal_categories():
     বাংলাদেশের আইনের বিভিন্ন ক্যাটাগরি
     Different categories of Bangladesh law
     """
-    categories = {
-        "family_law": {
-            "name": "পারিবারিক আইন (Family Law)",
-            "topics": ["বিবাহ", "তালাক", "ভরণপোষণ", "সন্তানের অধিকার", "উত্তরাধিকার"],
-            "description": "পারিবারিক সম্পর্ক এবং দায়বদ্ধতা সংক্রান্ত আইন"
-        },
-        "property_law": {
-            "name": "সম্পত্তি আইন (Property Law)",
-            "topics": ["জমি ক্রয়-বিক্রয়", "ভাড়া", "দখল", "রেজিস্ট্রেশন", "মালিকানা"],
-            "description": "সম্পত্তির মালিকানা এবং লেনদেন সংক্রান্ত আইন"
-        },
-        "criminal_law": {
-            "name": "ফৌজদারি আইন (Criminal Law)",
-            "topics": ["চুরি", "প্রতারণা", "আক্রমণ", "হত্যা", "মাদক"],
-            "description": "অপরাধ এবং শাস্তি সংক্রান্ত আইন"
-        },
-        "labor_law": {
-            "name": "শ্রম আইন (Labor Law)",
-            "topics": ["চাকরি", "বেতন", "ছুটি", "অবসর", "কর্মী অধিকার"],
-            "description": "কর্মী এবং মালিকের অধিকার ও দায়বদ্ধতা"
-        },
-        "consumer_law": {
-            "name": "ভোক্তা অধিকার (Consumer Rights)",
-            "topics": ["পণ্য ফেরত", "প্রতারণা", "গুণগত মান", "বিজ্ঞাপন", "সেবা"],
-            "description": "ভোক্তাদের অধিকার এবং সুরক্ষা"
-        },
-        "cyber_law": {
-            "name": "সাইবার আইন (Cyber Law)",
-            "topics": ["হ্যাকিং", "অনলাইন প্রতারণা", "ডিজিটাল নিরাপত্তা", "সামাজিক মাধ্যম"],
-            "description": "ডিজিটাল অপরাধ এবং অনলাইন নিরাপত্তা"
-        }
-    }
+    categories = LEGAL_CATEGORIES
     
     return {
         "legal_categories": categories,
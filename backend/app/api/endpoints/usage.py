@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from core.profiling import TimedRoute
+from core.security import get_api_client
+from services.usage_service import usage_service
+
+router = APIRouter(route_class=TimedRoute)
+
+@router.get("/me")
+async def get_my_usage(
+    days: int = Query(default=30, ge=1, le=366, description="Number of days to report"),
+    client: str = Depends(get_api_client)
+):
+    """
+    Token usage per day, endpoint and model for the calling API key
+    """
+    report = await usage_service.report(client, days=days)
+    return {
+        **report,
+        "status": "success"
+    }
@@ -17,6 +17,37 @@ class Settings(BaseSettings):
     
     # API Keys
     groq_api_key: Optional[str] = None
+
+    # Client API keys as {"<key>": "<client name>"}; empty means authentication is off
+    api_keys: dict = {}
+
+    # Token quotas per client (0 = unlimited), overridable as {"<client name>": {"daily": n, "monthly": n}}
+    daily_token_quota: int = 0
+    monthly_token_quota: int = 0
+    api_key_quotas: dict = {}
+    usage_flush_interval_seconds: int = 30
+
+    # Early rejection before any upstream call
+    max_request_body_bytes: int = 16 * 1024
+    request_gate_enabled: bool = True
+
+    # Replace phone/NID/passport/bKash numbers, emails and addresses before prompts reach Groq
+    pii_redaction_enabled: bool = True
+
+    # Append-only interaction log - compressed column blocks in size-rotated segments
+    interaction_log_enabled: bool = True
+    interaction_log_dir: str = "./interaction_logs"
+    interaction_log_segment_bytes: int = 64 * 1024 * 1024
+    interaction_log_block_records: int = 1000
+    interaction_log_flush_seconds: float = 5.0
+    interaction_log_queue_size: int = 10000
+
+    # Request profiling - X-Profile-Token header or a random fraction of requests
+    profiling_token: Optional[str] = None
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5.0
+    profiling_output_dir: str = "./profiles"
+    profiling_max_files: int = 200
     
     # CORS Settings - Production domains add করবো
     frontend_url: str = "http://localhost:3000"
@@ -24,6 +55,27 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./app.db"
+
+    # WebSocket chat - concurrent streams per connection and unsent token frames before backpressure
+    ws_max_streams: int = 4
+    ws_send_buffer_frames: int = 64
+
+    # Adaptive max_tokens - percentile of recorded completion lengths per endpoint/problem type
+    token_budget_percentile: float = 0.95
+    token_budget_headroom: float = 1.1
+    token_budget_min_samples: int = 20
+    token_budget_window: int = 500
+    token_budget_floor: int = 128
+    token_budget_max_continuations: int = 2
+
+    # Precomputed answers for catalogued legal topics
+    topic_cache_warm_enabled: bool = True
+    topic_cache_path: str = "./topic_cache.json"
+    topic_cache_refresh_age_seconds: int = 7 * 24 * 3600
+    topic_cache_max_age_seconds: int = 14 * 24 * 3600
+    topic_cache_check_interval_seconds: int = 3600
+    topic_cache_call_interval_seconds: float = 5.0
+    topic_cache_idle_poll_seconds: float = 1.0
     
     # Production settings
     host: str = "0.0.0.0"
@@ -0,0 +1,279 @@
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import Counter
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Optional
+from datetime import datetime
+from .config import settings
+from services.interaction_log import interaction_log
+from services.legal_catalog import catalogued_topic
+from services.usage_service import current_client
+import asyncio
+import dataclasses
+import functools
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+
+# Request model fields copied into the interaction log. Topic-like fields are
+# free text, so only a catalogued topic is logged.
+LOGGED_FIELDS = ("problem_type", "location", "urgency_level")
+TOPIC_FIELDS = ("law_topic", "case_type", "legal_action")
+# Free-text descriptions may hold personal data, so only their size is logged
+DESCRIPTION_FIELDS = ("problem_description", "situation")
+
+class RequestTimings:
+    """
+    Time spent per phase of one request, in milliseconds, plus attributes
+    collected for the interaction log
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.attributes: Dict[str, object] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds * 1000
+
+    def server_timing(self) -> str:
+        self.phases["total"] = (time.perf_counter() - self.started) * 1000
+        return ", ".join(f"{phase};dur={ms:.1f}" for phase, ms in self.phases.items())
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+def annotate(**fields) -> None:
+    """
+    Attach attributes (e.g. cache="hit") to the current request's log record
+    """
+    timings = current_timings.get()
+    if timings is not None:
+        timings.attributes.update(fields)
+
+def accumulate(**counts) -> None:
+    """
+    Add to numeric attributes (e.g. tokens across several upstream calls)
+    """
+    timings = current_timings.get()
+    if timings is not None:
+        for name, value in counts.items():
+            timings.attributes[name] = timings.attributes.get(name, 0) + value
+
+def log_interaction(endpoint: str, status_code: int, timings: RequestTimings) -> None:
+    """
+    Queue the interaction log record for a finished request or stream
+    """
+    interaction_log.append({
+        "ts": time.time(),
+        "endpoint": endpoint,
+        "status": status_code,
+        "latency_ms": (time.perf_counter() - timings.started) * 1000,
+        "upstream_ms": timings.phases.get("upstream"),
+        "client": current_client.get(),
+        **timings.attributes
+    })
+
+async def _log_when_finished(body: AsyncIterator, endpoint: str, status_code: int,
+                             timings: RequestTimings) -> AsyncIterator:
+    # Streamed responses are logged once the body is sent, with the stream's tokens
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        log_interaction(endpoint, status_code, timings)
+
+def _annotate_request_models(values: dict) -> None:
+    for value in values.values():
+        if not isinstance(value, BaseModel):
+            continue
+        fields = {name: getattr(value, name) for name in LOGGED_FIELDS if hasattr(value, name)}
+        topic = next(
+            (catalogued_topic(getattr(value, name)) for name in TOPIC_FIELDS if hasattr(value, name)),
+            None
+        )
+        if topic is not None:
+            fields["topic"] = topic
+        description = next((getattr(value, name) for name in DESCRIPTION_FIELDS if hasattr(value, name)), None)
+        if description is not None:
+            fields["description_chars"] = len(description)
+        annotate(**fields)
+
+@contextmanager
+def timed(phase: str):
+    """
+    Add the duration of the block to the current request's Server-Timing breakdown
+    """
+    timings = current_timings.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.add(phase, time.perf_counter() - started)
+
+class TaskSampler:
+    """
+    Sampling profiler for one asyncio task.
+
+    A background thread snapshots the event loop thread's stack at a fixed
+    interval and keeps only samples taken while the profiled task is the one
+    running, so concurrent requests do not leak into the profile. Output is
+    in collapsed-stack format for flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.thread_id = threading.get_ident()
+        self.samples: Counter = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or asyncio.current_task(self.loop) is not self.task:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+def _should_profile(request: Request) -> bool:
+    token = request.headers.get("x-profile-token")
+    # Compared as bytes: compare_digest rejects non-ASCII str, and headers arrive latin-1 decoded
+    if token and settings.profiling_token and secrets.compare_digest(
+        token.encode("latin-1"), settings.profiling_token.encode()
+    ):
+        return True
+    return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+def _write_profile(request: Request, folded: str) -> str:
+    output_dir = Path(settings.profiling_output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    route = re.sub(r"[^A-Za-z0-9]+", "_", request.url.path).strip("_")
+    path = output_dir / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.method}-{route}.folded"
+    path.write_text(folded, encoding="utf-8")
+
+    # Keep only the newest profiles so sampling cannot fill the disk; names sort by time
+    profiles = sorted(output_dir.glob("*.folded"))
+    for old_path in profiles[:max(0, len(profiles) - settings.profiling_max_files)]:
+        old_path.unlink(missing_ok=True)
+    return str(path)
+
+class TimedRoute(APIRoute):
+    """
+    Route that reports validation / handler / serialization time (plus any
+    phases recorded with `timed`) in a Server-Timing header, and runs the
+    sampling profiler for requests that ask for it.
+    """
+
+    def get_route_handler(self) -> Callable:
+        call = self.dependant.call
+        marks: ContextVar[Optional[dict]] = ContextVar("route_marks", default=None)
+
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(**values):
+                _annotate_request_models(values)
+                marks.get()["call_started"] = time.perf_counter()
+                try:
+                    return await call(**values)
+                finally:
+                    marks.get()["call_finished"] = time.perf_counter()
+        else:
+            @functools.wraps(call)
+            def timed_call(**values):
+                _annotate_request_models(values)
+                marks.get()["call_started"] = time.perf_counter()
+                try:
+                    return call(**values)
+                finally:
+                    marks.get()["call_finished"] = time.perf_counter()
+
+        # Build the stock handler around the wrapped endpoint, leaving self.dependant intact
+        original = self.dependant
+        self.dependant = dataclasses.replace(original, call=timed_call)
+        try:
+            handler = super().get_route_handler()
+        finally:
+            self.dependant = original
+
+        async def timed_handler(request: Request) -> Response:
+            timings = RequestTimings()
+            current_timings.set(timings)
+            route_marks = {}
+            marks.set(route_marks)
+
+            sampler = None
+            if _should_profile(request):
+                sampler = TaskSampler(settings.profiling_interval_ms / 1000)
+                sampler.start()
+
+            status_code = 500
+            streaming = False
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+                streaming = isinstance(response, StreamingResponse)
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                # Turned into a 422 by FastAPI's exception handler
+                status_code = 422
+                raise
+            finally:
+                if sampler:
+                    sampler.stop()
+                if not streaming:
+                    log_interaction(request.url.path, status_code, timings)
+
+            if streaming:
+                response.body_iterator = _log_when_finished(
+                    response.body_iterator, request.url.path, status_code, timings
+                )
+
+            finished = time.perf_counter()
+            if "call_started" in route_marks:
+                call_phases = timings.phases
+                upstream_and_prompt = call_phases.get("upstream", 0.0) + call_phases.get("prompt", 0.0)
+                handler_ms = (route_marks["call_finished"] - route_marks["call_started"]) * 1000
+                timings.phases = {
+                    "validation": (route_marks["call_started"] - timings.started) * 1000,
+                    **call_phases,
+                    "handler": max(0.0, handler_ms - upstream_and_prompt),
+                    "serialization": (finished - route_marks["call_finished"]) * 1000
+                }
+            response.headers.append("Server-Timing", timings.server_timing())
+
+            if sampler and sampler.samples:
+                profile_path = await asyncio.to_thread(_write_profile, request, sampler.folded())
+                response.headers.append("X-Profile-File", os.path.basename(profile_path))
+
+            return response
+
+        return timed_handler
@@ -1,6 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, WebSocketException, status
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from .config import settings
+from services.usage_service import usage_service, current_client, current_endpoint
 import os
 
 def setup_cors(app: FastAPI) -> None:
@@ -32,4 +36,102 @@ def setup_cors(app: FastAPI) -> None:
         expose_headers=["*"]
     )
     
-    print(f"🔒 CORS configured for: {', '.join(allowed_origins[:3])}...")
\ No newline at end of file
+    print(f"🔒 CORS configured for: {', '.join(allowed_origins[:3])}...")
+
+class _BodyTooLarge(HTTPException):
+    # An HTTPException so FastAPI's body parsing re-raises it as a 413
+    # instead of wrapping it in a 400
+    def __init__(self, max_body_bytes: int):
+        super().__init__(status_code=413, detail=f"Request body exceeds {max_body_bytes} bytes")
+
+class RequestSizeLimitMiddleware:
+    """
+    Reject request bodies over max_request_body_bytes with 413, checking
+    Content-Length up front and counting bytes while the body streams in,
+    so an oversized body is never fully read or parsed
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        too_large = JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds {self.max_body_bytes} bytes"}
+        )
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise _BodyTooLarge(self.max_body_bytes)
+            return message
+
+        async def tracked_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await too_large(scope, receive, send)
+
+def setup_request_limits(app: FastAPI) -> None:
+    """
+    Body size limit that runs before routing and validation
+    """
+    app.add_middleware(RequestSizeLimitMiddleware, max_body_bytes=settings.max_request_body_bytes)
+
+async def get_api_client(connection: HTTPConnection) -> str:
+    """
+    Resolve the client name from the X-API-Key header (or ?api_key= for WebSockets)
+    """
+    if not settings.api_keys:
+        return "anonymous"
+
+    api_key = connection.headers.get("x-api-key")
+    # Browsers cannot set headers on a WebSocket handshake; HTTP routes never read
+    # the query string, where keys would end up in proxy and access logs
+    if not api_key and connection.scope["type"] == "websocket":
+        api_key = connection.query_params.get("api_key")
+    client = settings.api_keys.get(api_key) if api_key else None
+    if client is None:
+        if connection.scope["type"] == "websocket":
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid API key")
+        raise HTTPException(status_code=401, detail="Invalid or missing API key")
+    return client
+
+async def require_api_key(connection: HTTPConnection) -> str:
+    """
+    Authenticate the client, reject it when a token quota is used up and
+    attribute the request's upstream token usage to it
+    """
+    client = await get_api_client(connection)
+
+    exhausted = usage_service.quota_exceeded(client)
+    if exhausted:
+        if connection.scope["type"] == "websocket":
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=f"{exhausted} token quota exceeded")
+        raise HTTPException(status_code=429, detail=f"{exhausted.capitalize()} token quota exceeded")
+
+    current_client.set(client)
+    current_endpoint.set(connection.url.path)
+    return client
@@ -0,0 +1,231 @@
+"""
+Offline evaluation of answer quality against latency and tokens.
+
+    cd backend/app
+    python -m evaluation.runner --backend local --backend groq:llama3-8b-8192 \
+        --variants my_prompts.json --parallel 4
+
+Each (backend, prompt variant) pair answers every question in the dataset.
+Answers are cached by backend, prompt, question and max_tokens, so a rerun
+only calls the backends whose inputs changed. Scores are recomputed on
+every run from the cached answers.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import sys
+import time
+
+EVALUATION_DIR = Path(__file__).parent
+DEFAULT_DATASET = EVALUATION_DIR / "datasets" / "bangladesh_legal.json"
+DEFAULT_CACHE = EVALUATION_DIR / ".cache.json"
+
+# The seven sections GroqService.system_prompt asks for, as Bengali and English headings
+SECTIONS = [
+    ("আইনি বিশ্লেষণ", "Legal Analysis"),
+    ("আপনার অধিকার", "Your Rights"),
+    ("পরবর্তী পদক্ষেপ", "Next Steps"),
+    ("প্রয়োজনীয় কাগজপত্র", "Required Documents"),
+    ("কোথায় যেতে হবে", "Where to Go"),
+    ("আনুমানিক খরচ", "Estimated Cost"),
+    ("সতর্কতা", "Warning"),
+]
+
+def section_completeness(answer: str) -> float:
+    """
+    Share of the seven sections whose heading appears in the answer
+    """
+    text = answer.casefold()
+    found = sum(1 for names in SECTIONS if any(name.casefold() in text for name in names))
+    return found / len(SECTIONS)
+
+def fact_recall(answer: str, facts: List) -> float:
+    """
+    Share of reference facts mentioned; a fact is a keyword or a list of
+    accepted alternatives
+    """
+    if not facts:
+        return 1.0
+    text = answer.casefold()
+    hits = 0
+    for fact in facts:
+        alternatives = fact if isinstance(fact, list) else [fact]
+        if any(alternative.casefold() in text for alternative in alternatives):
+            hits += 1
+    return hits / len(facts)
+
+class LocalBackend:
+    """
+    Stand-in that answers instantly in the seven-section format, for trying
+    the harness without an API key
+    """
+
+    name = "local"
+
+    def resolve_prompt(self, system_prompt: Optional[str]) -> str:
+        return system_prompt or "default"
+
+    async def answer(self, question: str, system_prompt: Optional[str], max_tokens: int) -> dict:
+        await asyncio.sleep(0.01)
+        response = "\n".join(f"{i}. **{bn} ({en}):** {question}" for i, (bn, en) in enumerate(SECTIONS, start=1))
+        return {"response": response, "tokens_used": len(response.split()), "status": "success"}
+
+class GroqBackend:
+    """
+    GroqService with the model and system prompt swapped per variant
+    """
+
+    def __init__(self, model: str):
+        self.name = f"groq:{model}"
+        self.model = model
+        self.services: Dict[str, object] = {}
+
+    def _service(self, system_prompt: Optional[str]):
+        # Imported lazily so the local backend works without GROQ_API_KEY
+        from services.groq_service import GroqService
+
+        key = system_prompt or ""
+        if key not in self.services:
+            service = GroqService()
+            service.model = self.model
+            if system_prompt:
+                service.system_prompt = system_prompt
+            self.services[key] = service
+        return self.services[key]
+
+    def resolve_prompt(self, system_prompt: Optional[str]) -> str:
+        return self._service(system_prompt).system_prompt
+
+    async def answer(self, question: str, system_prompt: Optional[str], max_tokens: int) -> dict:
+        return await self._service(system_prompt).generate_legal_advice(question, max_tokens=max_tokens)
+
+def make_backend(spec: str):
+    if spec == "local":
+        return LocalBackend()
+    if spec.startswith("groq:"):
+        return GroqBackend(spec.split(":", 1)[1])
+    raise ValueError(f"Unknown backend '{spec}' (use 'local' or 'groq:<model>')")
+
+def _cache_key(backend_name: str, system_prompt: str, question: str, max_tokens: int) -> str:
+    payload = json.dumps([backend_name, system_prompt, question, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(fraction * len(ordered))) - 1]
+
+async def run_evaluation(dataset: List[dict], backends: list, variants: Dict[str, Optional[str]],
+                         parallel: int, max_tokens: int, cache: Dict[str, dict]) -> List[dict]:
+    """
+    Answer every question with every backend/variant, reusing cached answers
+    """
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def evaluate(backend, variant: str, system_prompt: Optional[str], item: dict) -> dict:
+        key = _cache_key(backend.name, backend.resolve_prompt(system_prompt), item["question"], max_tokens)
+        cached = key in cache
+        if not cached:
+            async with semaphore:
+                started = time.perf_counter()
+                result = await backend.answer(item["question"], system_prompt, max_tokens)
+                latency = time.perf_counter() - started
+            entry = {
+                "response": result.get("response", ""),
+                "tokens_used": result.get("tokens_used"),
+                "latency": latency,
+                "error": result.get("error") if result.get("status") == "error" else None
+            }
+            if entry["error"] is None:
+                cache[key] = entry
+        else:
+            entry = cache[key]
+
+        return {
+            "backend": backend.name,
+            "variant": variant,
+            "id": item["id"],
+            "cached": cached,
+            "latency": entry["latency"],
+            "tokens_used": entry["tokens_used"],
+            "error": entry["error"],
+            "sections": section_completeness(entry["response"]),
+            "recall": fact_recall(entry["response"], item.get("facts", []))
+        }
+
+    return await asyncio.gather(*(
+        evaluate(backend, variant, system_prompt, item)
+        for backend in backends
+        for variant, system_prompt in variants.items()
+        for item in dataset
+    ))
+
+def summarize(results: List[dict]) -> List[dict]:
+    groups: Dict[tuple, List[dict]] = {}
+    for result in results:
+        groups.setdefault((result["backend"], result["variant"]), []).append(result)
+
+    summary = []
+    for (backend, variant), rows in groups.items():
+        ok = [row for row in rows if row["error"] is None]
+        latencies = [row["latency"] for row in ok]
+        tokens = [row["tokens_used"] for row in ok if row["tokens_used"] is not None]
+        summary.append({
+            "backend": backend,
+            "variant": variant,
+            "questions": len(rows),
+            "errors": len(rows) - len(ok),
+            "cached": sum(1 for row in rows if row["cached"]),
+            "latency_p50": round(_percentile(latencies, 0.5), 3) if latencies else None,
+            "latency_p95": round(_percentile(latencies, 0.95), 3) if latencies else None,
+            "avg_tokens": round(sum(tokens) / len(tokens), 1) if tokens else None,
+            "section_completeness": round(sum(row["sections"] for row in ok) / len(ok), 3) if ok else None,
+            "fact_recall": round(sum(row["recall"] for row in ok) / len(ok), 3) if ok else None
+        })
+    return summary
+
+def _load_json(path: Path, default):
+    if not path.exists():
+        return default
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Evaluate answer quality vs latency across models and prompts")
+    parser.add_argument("--dataset", type=Path, default=DEFAULT_DATASET, help="Questions with reference facts (JSON)")
+    parser.add_argument("--backend", action="append", default=None, help="'local' or 'groq:<model>', repeatable")
+    parser.add_argument("--variants", type=Path, help="JSON object of prompt variant name -> system prompt")
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent backend calls")
+    parser.add_argument("--max-tokens", type=int, default=1200)
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE, help="Answer cache file")
+    parser.add_argument("--output", type=Path, help="Write per-question results and summary as JSON")
+    args = parser.parse_args(argv)
+
+    dataset = _load_json(args.dataset, [])
+    backends = [make_backend(spec) for spec in (args.backend or ["local"])]
+    # "default" keeps the backend's own system prompt
+    variants: Dict[str, Optional[str]] = {"default": None}
+    if args.variants:
+        variants.update(_load_json(args.variants, {}))
+    cache = _load_json(args.cache, {})
+
+    results = asyncio.run(run_evaluation(dataset, backends, variants, args.parallel, args.max_tokens, cache))
+    summary = summarize(results)
+
+    args.cache.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+    if args.output:
+        args.output.write_text(
+            json.dumps({"summary": summary, "results": results}, ensure_ascii=False, indent=2),
+            encoding="utf-8"
+        )
+
+    columns = ["backend", "variant", "questions", "errors", "cached", "latency_p50",
+               "latency_p95", "avg_tokens", "section_completeness", "fact_recall"]
+    print("  ".join(f"{column:>20}" for column in columns))
+    for row in summary:
+        print("  ".join(f"{str(row[column]):>20}" for column in columns))
+
+if __name__ == "__main__":
+    sys.exit(main())
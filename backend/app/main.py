@@ -6,10 +6,25 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from core.config import settings
-from core.security import setup_cors
+from core.security import setup_cors, setup_request_limits
 from api.api_v1 import api_router
+from services.topic_cache_service import topic_cache
+from services.usage_service import usage_service
+from services.interaction_log import interaction_log
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Token accounting flush, interaction log writer and background precomputation of catalogued legal topics
+    await usage_service.start()
+    interaction_log.start()
+    topic_cache.start()
+    yield
+    await topic_cache.stop()
+    await interaction_log.stop()
+    await usage_service.stop()
 
 # Create FastAPI application with production settings
 app = FastAPI(
@@ -29,6 +44,7 @@ app = FastAPI(
     
     **Disclaimer:** এই সিস্টেম শুধুমাত্র তথ্যগত উদ্দেশ্যে। নির্দিষ্ট আইনি সমস্যার জন্য অভিজ্ঞ আইনজীবীর পরামর্শ নিন।
     """,
+    lifespan=lifespan,
     docs_url="/docs",
     redoc_url="/redoc",
     contact={
@@ -41,7 +57,10 @@ app = FastAPI(
     }
 )
 
-# Setup CORS for production
+# Reject oversized bodies before they are read and validated
+setup_request_limits(app)
+
+# Setup CORS for production (added last so it wraps error responses too)
 setup_cors(app)
 
 # Include API routes
@@ -66,7 +85,8 @@ def read_root():
             "legal_advice": "/api/v1/legal/legal-advice",
             "legal_categories": "/api/v1/legal/legal-categories",
             "emergency_contacts": "/api/v1/legal/emergency-contacts",
-            "ai_chat": "/api/v1/ai/chat"
+            "ai_chat": "/api/v1/ai/chat",
+            "ai_chat_websocket": "/api/v1/ai/ws"
         }
     }
 
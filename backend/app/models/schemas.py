@@ -69,7 +69,7 @@ class ChatRequest(BaseModel):
     General chat request model
     """
     message: str = Field(..., min_length=1, max_length=2000, description="User message")
-    max_tokens: Optional[int] = Field(default=1000, ge=10, le=2000, description="Maximum response tokens")
+    max_tokens: Optional[int] = Field(default=None, ge=10, le=2000, description="Maximum response tokens (learned from usage when omitted)")
     temperature: Optional[float] = Field(default=0.2, ge=0.0, le=1.0, description="Response creativity (lower for legal)")
 
 class ChatResponse(BaseModel):
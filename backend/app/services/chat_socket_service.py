@@ -0,0 +1,166 @@
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from core.config import settings
+from core.profiling import RequestTimings, current_timings, log_interaction
+from models.schemas import ChatRequest
+from services.groq_service import groq_service
+from services.request_gate import request_gate
+from services.usage_service import usage_service, current_client, SYSTEM_CLIENT
+from typing import Dict
+import asyncio
+import functools
+import json
+
+# Interaction log status for a stream the client cancelled or disconnected from
+# (the "client closed request" code nginx uses)
+STATUS_CANCELLED = 499
+
+class ChatSocketSession:
+    """
+    Multiplexes several chat streams over one WebSocket connection.
+
+    Client frames:
+        {"type": "chat", "id": "<stream id>", "message": "...", "max_tokens": 1000}
+        {"type": "cancel", "id": "<stream id>"}
+        {"type": "ping"}
+
+    Server frames:
+        {"type": "token", "id": ..., "chunk": "..."}
+        {"type": "done" | "cancelled", "id": ...}
+        {"type": "error", "id": ..., "error": "..."}
+        {"type": "pong"}
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.streams: Dict[str, asyncio.Task] = {}
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        # Token frames need a credit, the writer returns it once the frame is sent.
+        # A slow reader drains credits, which pauses the upstream iteration.
+        self.credits = asyncio.Semaphore(settings.ws_send_buffer_frames)
+
+    async def run(self) -> None:
+        writer = asyncio.create_task(self._writer())
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("text") is None:
+                    self._send({"type": "error", "id": None, "error": "Only text frames are supported"})
+                    continue
+                self._handle(message["text"])
+        except WebSocketDisconnect:
+            pass
+        finally:
+            tasks = list(self.streams.values()) + [writer]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _handle(self, raw: str) -> None:
+        try:
+            frame = json.loads(raw)
+        except json.JSONDecodeError:
+            self._send({"type": "error", "id": None, "error": "Invalid JSON frame"})
+            return
+
+        if not isinstance(frame, dict):
+            self._send({"type": "error", "id": None, "error": "Frame must be a JSON object"})
+            return
+
+        frame_type = frame.get("type")
+        stream_id = frame.get("id")
+
+        if frame_type == "ping":
+            self._send({"type": "pong"})
+        elif frame_type == "cancel":
+            task = self.streams.get(stream_id)
+            if task:
+                task.cancel()
+        elif frame_type == "chat":
+            self._start_stream(stream_id, frame)
+        else:
+            self._send({"type": "error", "id": stream_id, "error": f"Unknown frame type: {frame_type}"})
+
+    def _start_stream(self, stream_id, frame: dict) -> None:
+        if not isinstance(stream_id, str) or not stream_id:
+            self._send({"type": "error", "id": stream_id, "error": "Chat frame needs a string 'id'"})
+            return
+        if stream_id in self.streams:
+            self._send({"type": "error", "id": stream_id, "error": "Stream id already active"})
+            return
+        if len(self.streams) >= settings.ws_max_streams:
+            self._send({"type": "error", "id": stream_id, "error": "Too many concurrent streams"})
+            return
+        # The handshake check alone would let one long-lived socket stream past its quota
+        exhausted = usage_service.quota_exceeded(current_client.get() or SYSTEM_CLIENT)
+        if exhausted:
+            self._send({"type": "error", "id": stream_id, "error": f"{exhausted.capitalize()} token quota exceeded"})
+            return
+
+        try:
+            request = ChatRequest(**{k: v for k, v in frame.items() if k not in ("type", "id")})
+        except ValidationError as e:
+            self._send({"type": "error", "id": stream_id, "error": str(e)})
+            return
+
+        # Each stream gets its own timings and log record. Cleanup runs in a done
+        # callback because a task cancelled before its first step never enters
+        # _run_stream's body.
+        timings = RequestTimings()
+        task = asyncio.create_task(self._run_stream(stream_id, request, timings))
+        task.add_done_callback(functools.partial(self._stream_finished, stream_id, timings))
+        self.streams[stream_id] = task
+
+    async def _run_stream(self, stream_id: str, request: ChatRequest, timings: RequestTimings) -> int:
+        """
+        Stream one answer; returns the status code for the interaction log
+        """
+        current_timings.set(timings)
+        try:
+            gate = request_gate.check(request.message)
+            if gate["action"] == "canned":
+                self._send({"type": "token", "id": stream_id, "chunk": gate["response"]})
+                self._send({"type": "done", "id": stream_id})
+                return 200
+
+            async for chunk in groq_service.generate_streaming_response(
+                request_gate.with_language_hint(request.message, gate["language"]),
+                max_tokens=request.max_tokens
+            ):
+                await self.credits.acquire()
+                self.outbox.put_nowait({"type": "token", "id": stream_id, "chunk": chunk})
+            self._send({"type": "done", "id": stream_id})
+            return 200
+        except Exception as e:
+            self._send({"type": "error", "id": stream_id, "error": str(e)})
+            return 500
+
+    def _stream_finished(self, stream_id: str, timings: RequestTimings, task: asyncio.Task) -> None:
+        if self.streams.get(stream_id) is task:
+            del self.streams[stream_id]
+
+        if task.cancelled():
+            status_code = STATUS_CANCELLED
+            self._send({"type": "cancelled", "id": stream_id})
+        elif task.exception() is not None:
+            status_code = 500
+        else:
+            status_code = task.result()
+        log_interaction(self.websocket.url.path, status_code, timings)
+
+    def _send(self, frame: dict) -> None:
+        # Control frames skip the credit check so cancel/error replies are never stuck
+        self.outbox.put_nowait(frame)
+
+    async def _writer(self) -> None:
+        while True:
+            frame = await self.outbox.get()
+            try:
+                await self.websocket.send_text(json.dumps(frame, ensure_ascii=False))
+            except Exception:
+                # Connection is gone; the receive loop tears the session down
+                return
+            if frame["type"] == "token":
+                self.credits.release()
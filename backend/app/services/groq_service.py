@@ -1,9 +1,20 @@
-from groq import Groq
+from groq import AsyncGroq
 from core.config import settings
+from core.profiling import timed, accumulate
+from services.token_budget import token_budget
+from services.usage_service import usage_service
+from services.pii_redactor import RedactionSession
 from typing import Optional, AsyncGenerator, List, Dict
 import json
+import time
 from datetime import datetime
 
+# Default ceiling for general chat when the client does not pick max_tokens
+DEFAULT_CHAT_MAX_TOKENS = 1000
+
+# Sent after an answer was cut off by max_tokens
+CONTINUE_PROMPT = "আপনার আগের উত্তর যেখানে থেমেছে ঠিক সেখান থেকে চালিয়ে যান, কিছু পুনরাবৃত্তি করবেন না। / Continue exactly where you stopped without repeating anything."
+
 class GroqService:
     def __init__(self):
         """
@@ -12,9 +23,12 @@ class GroqService:
         if not settings.groq_api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
         
-        self.client = Groq(api_key=settings.groq_api_key)
+        self.async_client = AsyncGroq(api_key=settings.groq_api_key)
         self.model = "llama3-8b-8192"
         
+        # Upstream calls currently running; background jobs yield while this is non-zero
+        self.inflight = 0
+        
         # Bangladesh Legal AI Assistant System Prompt
         self.system_prompt = """You are a Bangladesh Legal Information Assistant (বাংলাদেশ আইনি তথ্য সহায়ক).
 
@@ -51,30 +65,134 @@ Your expertise covers:
 
 Remember: আইনি পরামর্শ নেওয়ার জন্য অভিজ্ঞ আইনজীবীর সাথে যোগাযোগ করুন।"""
 
-    async def generate_legal_advice(self, legal_problem: str, max_tokens: int = 1200) -> dict:
+    def _messages(self, user_content: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": self.system_prompt
+            },
+            {
+                "role": "user",
+                "content": user_content
+            }
+        ]
+
+    async def _complete(self, user_content: str, max_tokens: int, budget_key: Optional[str] = None) -> dict:
+        """
+        Run one completion. With a budget_key, max_tokens is the fixed ceiling and the
+        request is sized from recorded usage; answers cut off by the smaller budget are
+        continued until they finish or the ceiling is spent.
+        """
+        limit = token_budget.max_tokens_for(budget_key, max_tokens) if budget_key else max_tokens
+        adaptive = limit < max_tokens
+        redaction = RedactionSession()
+        with timed("prompt"):
+            if settings.pii_redaction_enabled:
+                user_content = redaction.redact(user_content)
+            messages = self._messages(user_content)
+        parts: List[str] = []
+        prompt_tokens = completion_tokens = reserved = continuations = 0
+        started = time.perf_counter()
+
+        while True:
+            # Async client: awaiting the round-trip keeps the event loop serving other
+            # requests and lets background jobs see this call in `inflight`
+            self.inflight += 1
+            try:
+                with timed("upstream"):
+                    chat_completion = await self.async_client.chat.completions.create(
+                        messages=messages,
+                        model=self.model,
+                        max_tokens=limit,
+                        temperature=0.2,  # Very low temperature for consistent legal info
+                        stream=False
+                    )
+            finally:
+                self.inflight -= 1
+            choice = chat_completion.choices[0]
+            content = choice.message.content or ""
+            parts.append(content)
+            reserved += limit
+            prompt_tokens += chat_completion.usage.prompt_tokens
+            completion_tokens += chat_completion.usage.completion_tokens
+            usage_service.record(
+                chat_completion.usage.prompt_tokens,
+                chat_completion.usage.completion_tokens,
+                self.model
+            )
+            accumulate(
+                prompt_tokens=chat_completion.usage.prompt_tokens,
+                completion_tokens=chat_completion.usage.completion_tokens
+            )
+
+            remaining = max_tokens - completion_tokens
+            if (not budget_key or choice.finish_reason != "length" or remaining <= 0
+                    or continuations >= settings.token_budget_max_continuations):
+                break
+
+            continuations += 1
+            limit = remaining
+            messages = messages + [
+                {"role": "assistant", "content": content},
+                {"role": "user", "content": CONTINUE_PROMPT}
+            ]
+
+        if budget_key:
+            token_budget.record(
+                budget_key,
+                completion_tokens=completion_tokens,
+                latency=time.perf_counter() - started,
+                reserved=reserved,
+                ceiling=max_tokens,
+                continuations=continuations,
+                adaptive=adaptive
+            )
+
+        return {
+            "response": redaction.restore("".join(parts)),
+            "tokens_used": prompt_tokens + completion_tokens,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "finish_reason": choice.finish_reason,
+            "continuations": continuations
+        }
+
+    async def generate_response(self, message: str, max_tokens: Optional[int] = None) -> dict:
+        """
+        General chat completion. Without max_tokens the budget is learned from usage.
+        """
+        try:
+            if max_tokens:
+                completion = await self._complete(message, max_tokens)
+            else:
+                completion = await self._complete(message, DEFAULT_CHAT_MAX_TOKENS, budget_key="chat")
+            
+            return {
+                **completion,
+                "model": self.model,
+                "timestamp": datetime.now().isoformat(),
+                "status": "success"
+            }
+            
+        except Exception as e:
+            return {
+                "response": "দুঃখিত, উত্তর তৈরিতে সমস্যা হচ্ছে। পরে আবার চেষ্টা করুন।",
+                "error": str(e),
+                "status": "error"
+            }
+
+    async def generate_legal_advice(self, legal_problem: str, max_tokens: int = 1200,
+                                    budget_key: Optional[str] = None) -> dict:
         """
         Generate Bangladesh-specific legal advice
         """
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self.system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": f"আইনি সমস্যা/Legal Problem: {legal_problem}"
-                    }
-                ],
-                model=self.model,
-                max_tokens=max_tokens,
-                temperature=0.2,  # Very low temperature for consistent legal info
-                stream=False
+            completion = await self._complete(
+                f"আইনি সমস্যা/Legal Problem: {legal_problem}",
+                max_tokens,
+                budget_key=budget_key
             )
             
-            ai_response = chat_completion.choices[0].message.content
-            
             # Add legal disclaimer in Bengali and English
             legal_disclaimer = """
 
@@ -84,9 +202,9 @@ Remember: আইনি পরামর্শ নেওয়ার জন্য
 This information is provided for general legal education purposes only and does not constitute legal advice. Please consult with a qualified lawyer for your specific legal matters."""
             
             return {
-                "response": ai_response + legal_disclaimer,
+                **completion,
+                "response": completion["response"] + legal_disclaimer,
                 "model": self.model,
-                "tokens_used": chat_completion.usage.total_tokens,
                 "specialization": "bangladesh_legal",
                 "timestamp": datetime.now().isoformat(),
                 "status": "success"
@@ -99,6 +217,95 @@ This information is provided for general legal education purposes only and does
                 "status": "error"
             }
     
+    async def generate_streaming_response(self, message: str, max_tokens: Optional[int] = None) -> AsyncGenerator[str, None]:
+        """
+        Stream the answer chunk by chunk. Cancelling the consumer closes the upstream request.
+        Without max_tokens the budget is learned from usage and a cut-off answer keeps streaming.
+        """
+        budget_key = None if max_tokens else "chat_stream"
+        ceiling = max_tokens or DEFAULT_CHAT_MAX_TOKENS
+        limit = token_budget.max_tokens_for(budget_key, ceiling) if budget_key else ceiling
+        adaptive = limit < ceiling
+        redaction = RedactionSession()
+        if settings.pii_redaction_enabled:
+            message = redaction.redact(message)
+        restorer = redaction.stream_restorer()
+        messages = self._messages(message)
+        completion_tokens = reserved = continuations = 0
+        started = time.perf_counter()
+
+        while True:
+            self.inflight += 1
+            try:
+                with timed("upstream"):
+                    stream = await self.async_client.chat.completions.create(
+                        messages=messages,
+                        model=self.model,
+                        max_tokens=limit,
+                        temperature=0.2,
+                        stream=True
+                    )
+            except Exception:
+                self.inflight -= 1
+                raise
+            reserved += limit
+            parts: List[str] = []
+            finish_reason = None
+
+            try:
+                async for chunk in stream:
+                    if chunk.x_groq and chunk.x_groq.usage:
+                        completion_tokens += chunk.x_groq.usage.completion_tokens
+                        usage_service.record(
+                            chunk.x_groq.usage.prompt_tokens,
+                            chunk.x_groq.usage.completion_tokens,
+                            self.model
+                        )
+                        accumulate(
+                            prompt_tokens=chunk.x_groq.usage.prompt_tokens,
+                            completion_tokens=chunk.x_groq.usage.completion_tokens
+                        )
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        parts.append(content)
+                        restored = restorer.feed(content)
+                        if restored:
+                            yield restored
+            finally:
+                # Abort the HTTP response so Groq stops generating for a cancelled stream
+                self.inflight -= 1
+                await stream.close()
+
+            remaining = ceiling - completion_tokens
+            if (not budget_key or finish_reason != "length" or remaining <= 0
+                    or continuations >= settings.token_budget_max_continuations):
+                break
+
+            continuations += 1
+            limit = remaining
+            messages = messages + [
+                {"role": "assistant", "content": "".join(parts)},
+                {"role": "user", "content": CONTINUE_PROMPT}
+            ]
+
+        tail = restorer.flush()
+        if tail:
+            yield tail
+
+        if budget_key:
+            token_budget.record(
+                budget_key,
+                completion_tokens=completion_tokens,
+                latency=time.perf_counter() - started,
+                reserved=reserved,
+                ceiling=ceiling,
+                continuations=continuations,
+                adaptive=adaptive
+            )
+    
     async def get_legal_procedures(self, case_type: str) -> dict:
         """
         Get step-by-step legal procedures for specific case types
@@ -106,7 +313,14 @@ This information is provided for general legal education purposes only and does
         procedure_prompt = f"বাংলাদেশে '{case_type}' এর জন্য ধাপে ধাপে আইনি প্রক্রিয়া বর্ণনা করুন। প্রয়োজনীয় কাগজপত্র, খরচ, এবং সময়সীমা উল্লেখ করুন।"
         
         try:
-            response = await self.generate_legal_advice(procedure_prompt, max_tokens=1000)
+            response = await self.generate_legal_advice(procedure_prompt, max_tokens=1000, budget_key="legal_procedure")
+            if response["status"] == "error":
+                return {
+                    "procedure": response["response"],
+                    "case_type": case_type,
+                    "status": "error",
+                    "error": response["error"]
+                }
             return {
                 "procedure": response["response"],
                 "case_type": case_type,
@@ -125,7 +339,7 @@ This information is provided for general legal education purposes only and does
         """
         law_prompt = f"বাংলাদেশের '{law_topic}' আইন সম্পর্কে সহজ ভাষায় ব্যাখ্যা করুন। সাধারণ মানুষ কিভাবে এই আইন প্রয়োগ করতে পারেন তা বলুন।"
         
-        return await self.generate_legal_advice(law_prompt, max_tokens=800)
+        return await self.generate_legal_advice(law_prompt, max_tokens=800, budget_key="explain_law")
     
     async def get_legal_rights(self, situation: str) -> dict:
         """
@@ -133,7 +347,7 @@ This information is provided for general legal education purposes only and does
         """
         rights_prompt = f"'{situation}' পরিস্থিতিতে বাংলাদেশের আইন অনুযায়ী একজন ব্যক্তির কি কি অধিকার রয়েছে? বিস্তারিত বলুন।"
         
-        return await self.generate_legal_advice(rights_prompt, max_tokens=800)
+        return await self.generate_legal_advice(rights_prompt, max_tokens=800, budget_key="legal_rights")
     
     async def get_document_requirements(self, legal_action: str) -> dict:
         """
@@ -141,7 +355,7 @@ This information is provided for general legal education purposes only and does
         """
         doc_prompt = f"বাংলাদেশে '{legal_action}' এর জন্য কি কি কাগজপত্র এবং প্রমাণ প্রয়োজন? বিস্তারিত তালিকা দিন।"
         
-        return await self.generate_legal_advice(doc_prompt, max_tokens=600)
+        return await self.generate_legal_advice(doc_prompt, max_tokens=600, budget_key="document_requirements")
     
     async def get_legal_contact_info(self, location: str = "ঢাকা") -> dict:
         """
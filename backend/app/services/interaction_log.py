@@ -0,0 +1,244 @@
+from core.config import settings
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import asyncio
+import json
+import math
+import mmap
+import os
+import struct
+import time
+import zlib
+
+# Every record has these columns; missing values are stored as null / NaN
+NUMERIC_COLUMNS = [
+    "ts", "status", "latency_ms", "upstream_ms",
+    "prompt_tokens", "completion_tokens", "description_chars"
+]
+TEXT_COLUMNS = [
+    "endpoint", "client", "cache", "problem_type", "location",
+    "urgency_level", "topic", "language", "gate"
+]
+
+BLOCK_MAGIC = b"ILB1"
+# magic, record count, body length, min ts, max ts, column count
+BLOCK_HEADER = struct.Struct("<4sIIddH")
+# column name length, column data length
+COLUMN_HEADER = struct.Struct("<HI")
+
+def encode_block(records: List[dict]) -> bytes:
+    """
+    Column-oriented block: each column is compressed on its own so queries
+    only decompress the columns they read
+    """
+    body = bytearray()
+    for name in NUMERIC_COLUMNS:
+        values = array("d", (float("nan") if r.get(name) is None else float(r[name]) for r in records))
+        body += _encode_column(name, values.tobytes())
+    for name in TEXT_COLUMNS:
+        values = [r.get(name) for r in records]
+        body += _encode_column(name, json.dumps(values, ensure_ascii=False).encode("utf-8"))
+
+    timestamps = [r["ts"] for r in records]
+    header = BLOCK_HEADER.pack(
+        BLOCK_MAGIC, len(records), len(body), min(timestamps), max(timestamps),
+        len(NUMERIC_COLUMNS) + len(TEXT_COLUMNS)
+    )
+    return header + bytes(body)
+
+def _encode_column(name: str, raw: bytes) -> bytes:
+    data = zlib.compress(raw, 6)
+    encoded_name = name.encode("utf-8")
+    return COLUMN_HEADER.pack(len(encoded_name), len(data)) + encoded_name + data
+
+def iter_blocks(path: Path, columns: List[str], since: float = 0.0) -> Iterator[Dict[str, list]]:
+    """
+    Memory-map a segment and yield the requested columns of each block whose
+    time range reaches `since`. A truncated trailing block is ignored.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            offset = 0
+            while offset + BLOCK_HEADER.size <= len(view):
+                magic, count, body_length, _, max_ts, column_count = BLOCK_HEADER.unpack_from(view, offset)
+                body_start = offset + BLOCK_HEADER.size
+                if magic != BLOCK_MAGIC or body_start + body_length > len(view):
+                    return
+                offset = body_start + body_length
+                if max_ts < since:
+                    continue
+
+                block = {}
+                position = body_start
+                for _ in range(column_count):
+                    name_length, data_length = COLUMN_HEADER.unpack_from(view, position)
+                    position += COLUMN_HEADER.size
+                    name = bytes(view[position:position + name_length]).decode("utf-8")
+                    position += name_length
+                    if name in columns:
+                        raw = zlib.decompress(view[position:position + data_length])
+                        if name in NUMERIC_COLUMNS:
+                            values = array("d")
+                            values.frombytes(raw)
+                            block[name] = values
+                        else:
+                            block[name] = json.loads(raw)
+                    position += data_length
+                yield block
+
+def segment_paths(directory: Path) -> List[Path]:
+    return sorted(directory.glob("interactions-*.seg"))
+
+class InteractionLog:
+    """
+    Append-only log of every API interaction.
+
+    Requests only enqueue a record; a background task batches records into
+    compressed column blocks and appends them to size-rotated segment files.
+    """
+
+    def __init__(self):
+        self.directory = Path(settings.interaction_log_dir)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.interaction_log_queue_size)
+        self.segment: Optional[Path] = None
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def append(self, record: dict) -> None:
+        if self.task is None:
+            return
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _segment_for_write(self) -> Path:
+        if self.segment is None or self.segment.stat().st_size >= settings.interaction_log_segment_bytes:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # pid keeps workers of the same deployment on separate files
+            self.segment = self.directory / f"interactions-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.seg"
+            self.segment.touch()
+        return self.segment
+
+    def _write(self, records: List[dict]) -> None:
+        block = encode_block(records)
+        with open(self._segment_for_write(), "ab") as f:
+            f.write(block)
+
+    async def _drain(self, records: List[dict]) -> None:
+        try:
+            await asyncio.to_thread(self._write, records)
+        except Exception as e:
+            print(f"⚠️  Interaction log write failed: {e}")
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            record = await self.queue.get()
+            if record is None:
+                return
+            records = [record]
+            deadline = time.monotonic() + settings.interaction_log_flush_seconds
+            while len(records) < settings.interaction_log_block_records:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                records.append(record)
+            await self._drain(records)
+
+    def start(self) -> None:
+        if settings.interaction_log_enabled and self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Write everything still queued, then stop the writer
+        """
+        if self.task is None:
+            return
+        task, self.task = self.task, None
+        await self.queue.put(None)
+        await task
+
+# Global log instance
+interaction_log = InteractionLog()
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(fraction * len(ordered))) - 1]
+
+def top_topics_per_day(directory: Path, days: int, limit: int) -> Dict[str, list]:
+    since = (datetime.now() - timedelta(days=days)).timestamp()
+    # Bucket by local day with integer arithmetic instead of a datetime per record
+    utc_offset = datetime.now().astimezone().utcoffset().total_seconds()
+    counts: Counter = Counter()
+    for path in segment_paths(directory):
+        for block in iter_blocks(path, ["ts", "topic", "problem_type"], since):
+            counts.update(
+                (int((ts + utc_offset) // 86400), topic or problem_type)
+                for ts, topic, problem_type in zip(block["ts"], block["topic"], block["problem_type"])
+                if ts >= since and (topic or problem_type)
+            )
+
+    per_day: Dict[str, list] = {}
+    for (day_number, label), count in counts.items():
+        day = datetime.fromtimestamp(day_number * 86400, tz=timezone.utc).strftime("%Y-%m-%d")
+        per_day.setdefault(day, []).append((label, count))
+
+    return {
+        day: sorted(labels, key=lambda item: item[1], reverse=True)[:limit]
+        for day, labels in sorted(per_day.items())
+    }
+
+def latency_by_endpoint(directory: Path, days: int) -> Dict[str, dict]:
+    since = (datetime.now() - timedelta(days=days)).timestamp()
+    latencies: Dict[str, List[float]] = {}
+    for path in segment_paths(directory):
+        for block in iter_blocks(path, ["ts", "endpoint", "latency_ms"], since):
+            for ts, endpoint, latency in zip(block["ts"], block["endpoint"], block["latency_ms"]):
+                if ts >= since:
+                    latencies.setdefault(endpoint, []).append(latency)
+
+    return {
+        endpoint: {
+            "requests": len(values),
+            "p50_ms": round(_percentile(values, 0.5), 1),
+            "p95_ms": round(_percentile(values, 0.95), 1)
+        }
+        for endpoint, values in sorted(latencies.items())
+    }
+
+if __name__ == "__main__":
+    # Query the log: python -m services.interaction_log {top-topics,latency} [--days N]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aggregate queries over interaction log segments")
+    parser.add_argument("query", choices=["top-topics", "latency"])
+    parser.add_argument("--dir", default=settings.interaction_log_dir, help="Segment directory")
+    parser.add_argument("--days", type=int, default=7, help="Look back this many days")
+    parser.add_argument("--limit", type=int, default=10, help="Topics per day")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.query == "top-topics":
+        for day, topics in top_topics_per_day(Path(args.dir), args.days, args.limit).items():
+            print(day)
+            for topic, count in topics:
+                print(f"  {count:>8}  {topic}")
+    else:
+        print(f"{'endpoint':<45} {'requests':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for endpoint, stats in latency_by_endpoint(Path(args.dir), args.days).items():
+            print(f"{endpoint:<45} {stats['requests']:>9} {stats['p50_ms']:>9} {stats['p95_ms']:>9}")
+    print(f"\n⏱️  {time.perf_counter() - started:.2f}s")
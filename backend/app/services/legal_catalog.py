@@ -0,0 +1,57 @@
+# Legal categories and the topics users ask about most.
+# Served by /legal/legal-categories and precomputed by the topic cache.
+from typing import Optional
+
+LEGAL_CATEGORIES = {
+    "family_law": {
+        "name": "পারিবারিক আইন (Family Law)",
+        "topics": ["বিবাহ", "তালাক", "ভরণপোষণ", "সন্তানের অধিকার", "উত্তরাধিকার"],
+        "description": "পারিবারিক সম্পর্ক এবং দায়বদ্ধতা সংক্রান্ত আইন"
+    },
+    "property_law": {
+        "name": "সম্পত্তি আইন (Property Law)",
+        "topics": ["জমি ক্রয়-বিক্রয়", "ভাড়া", "দখল", "রেজিস্ট্রেশন", "মালিকানা"],
+        "description": "সম্পত্তির মালিকানা এবং লেনদেন সংক্রান্ত আইন"
+    },
+    "criminal_law": {
+        "name": "ফৌজদারি আইন (Criminal Law)",
+        "topics": ["চুরি", "প্রতারণা", "আক্রমণ", "হত্যা", "মাদক"],
+        "description": "অপরাধ এবং শাস্তি সংক্রান্ত আইন"
+    },
+    "labor_law": {
+        "name": "শ্রম আইন (Labor Law)",
+        "topics": ["চাকরি", "বেতন", "ছুটি", "অবসর", "কর্মী অধিকার"],
+        "description": "কর্মী এবং মালিকের অধিকার ও দায়বদ্ধতা"
+    },
+    "consumer_law": {
+        "name": "ভোক্তা অধিকার (Consumer Rights)",
+        "topics": ["পণ্য ফেরত", "প্রতারণা", "গুণগত মান", "বিজ্ঞাপন", "সেবা"],
+        "description": "ভোক্তাদের অধিকার এবং সুরক্ষা"
+    },
+    "cyber_law": {
+        "name": "সাইবার আইন (Cyber Law)",
+        "topics": ["হ্যাকিং", "অনলাইন প্রতারণা", "ডিজিটাল নিরাপত্তা", "সামাজিক মাধ্যম"],
+        "description": "ডিজিটাল অপরাধ এবং অনলাইন নিরাপত্তা"
+    }
+}
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.split()).casefold()
+
+def catalogued_topics() -> list:
+    """
+    Every topic in the catalogue, without duplicates, in catalogue order
+    """
+    topics = []
+    for category in LEGAL_CATEGORIES.values():
+        for topic in category["topics"]:
+            if topic not in topics:
+                topics.append(topic)
+    return topics
+
+def catalogued_topic(text: str) -> Optional[str]:
+    """
+    Catalogue spelling of a topic, or None when the text is not a catalogued topic
+    """
+    normalized = normalize_topic(text)
+    return next((topic for topic in catalogued_topics() if normalize_topic(topic) == normalized), None)
@@ -0,0 +1,124 @@
+from typing import Dict
+import re
+
+# ASCII and Bengali digits
+D = "[0-9০-৯]"
+
+# kind -> (characters a match can start with, pattern).
+# Order matters: earlier alternatives win where matches overlap.
+PII_PATTERNS = {
+    "EMAIL": ("[A-Za-z0-9._%+-]", r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"),
+    # Mobile numbers, which are also bKash/Nagad wallet numbers: (+88) 01[3-9]XX-XXXXXX,
+    # +880 1XXX-XXXXXX or 01XXX XXX XXX
+    "PHONE": ("[+8৮0০]", rf"(?<!{D})(?:\+?(?:88|৮৮)[-\s]?)?[0০][-\s]?[1১][3-9৩-৯]{D}{{2}}(?:[-\s]?{D}{{6}}|[-\s]{D}{{3}}[-\s]{D}{{3}})(?!{D})"),
+    "BKASH_TXN": ("[tTট]", r"(?i:trx\s*id|transaction\s*id|ট্রানজেকশন\s*আইডি)\s*[:#-]?\s*[A-Za-z0-9]{8,12}\b"),
+    # Smart card / old NID numbers are 10, 13 or 17 digits. Ten digits could just as
+    # well be an amount, so that form needs the NID keyword right before it.
+    "NID": (f"(?:{D}|[nNজএ])", rf"(?<!{D})(?:{D}{{17}}|{D}{{13}})(?!{D})|(?<![A-Za-z])(?i:nid|national\s*id|জাতী(?:\u09df|\u09af\u09bc)\s*পরিচয়পত্র|এনআইডি)\s*(?i:no\.?|number|নং|নম্বর)?\s*[:#-]?\s*{D}{{10}}(?!{D})"),
+    "PASSPORT": ("[A-Z]", r"(?<![A-Za-z0-9])[A-Z]{1,2}[0-9]{7,8}(?![A-Za-z0-9])"),
+    "ADDRESS": ("[hHfFrRবফরসহ]", rf"(?<![A-Za-z])(?i:house|flat|road|holding|বাসা|বাড়ি|ফ্ল্যাট|রোড|সড়ক|হোল্ডিং)\s*(?i:no\.?|নং|#)?\s*[:-]?\s*{D}[0-9A-Za-zঀ-৿/-]*"),
+}
+
+# One alternation compiled once, so a single scan finds every kind. The
+# lookaheads on first characters let most positions fail without trying
+# every branch, which roughly triples throughput on Bengali prose.
+PII_REGEX = re.compile(
+    "(?=[A-Za-z0-9০-৯+বফরসহটজএ])(?:%s)" % "|".join(
+        f"(?P<{kind}>(?={first})(?:{pattern}))" for kind, (first, pattern) in PII_PATTERNS.items()
+    )
+)
+PLACEHOLDER_REGEX = re.compile(r"\[(?:%s)_\d+\]" % "|".join(PII_PATTERNS))
+# Could the tail of a chunk be the start of a placeholder split across chunks?
+PARTIAL_PLACEHOLDER_REGEX = re.compile(r"\[[A-Z_]*\d*$")
+MAX_PLACEHOLDER_LENGTH = max(len(kind) for kind in PII_PATTERNS) + 8
+
+PLACEHOLDER_NOTE = "\n\n(নোট: [PHONE_n] ধরণের চিহ্নগুলো গোপন তথ্যের জায়গায় বসানো হয়েছে; উত্তরে এগুলো হুবহু রাখুন। / Keep placeholders like [PHONE_n] exactly as written.)"
+
+class RedactionSession:
+    """
+    Reversible PII redaction for one upstream call.
+
+    Each distinct value gets a stable placeholder such as [PHONE_1]; the
+    mapping lives only in this object and is used to put the original values
+    back into the model's answer.
+    """
+
+    def __init__(self):
+        self.originals: Dict[str, str] = {}
+        self.placeholders: Dict[str, str] = {}
+        self.counts: Dict[str, int] = {}
+
+    def _replace(self, match: re.Match) -> str:
+        value = match.group(0)
+        placeholder = self.placeholders.get(value)
+        if placeholder is None:
+            kind = match.lastgroup
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            placeholder = f"[{kind}_{self.counts[kind]}]"
+            self.placeholders[value] = placeholder
+            self.originals[placeholder] = value
+        return placeholder
+
+    def redact(self, text: str) -> str:
+        redacted = PII_REGEX.sub(self._replace, text)
+        if self.originals:
+            redacted += PLACEHOLDER_NOTE
+        return redacted
+
+    def restore(self, text: str) -> str:
+        if not self.originals:
+            return text
+        return PLACEHOLDER_REGEX.sub(lambda m: self.originals.get(m.group(0), m.group(0)), text)
+
+    def stream_restorer(self) -> "StreamRestorer":
+        return StreamRestorer(self)
+
+class StreamRestorer:
+    """
+    Restores placeholders in streamed chunks, holding back a chunk tail that
+    may be the first half of a placeholder until the next chunk arrives
+    """
+
+    def __init__(self, session: RedactionSession):
+        self.session = session
+        self.buffer = ""
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        if not self.session.originals:
+            text, self.buffer = self.buffer, ""
+            return text
+
+        start = self.buffer.rfind("[")
+        if (start != -1 and len(self.buffer) - start <= MAX_PLACEHOLDER_LENGTH
+                and PARTIAL_PLACEHOLDER_REGEX.match(self.buffer, start)):
+            text, self.buffer = self.buffer[:start], self.buffer[start:]
+        else:
+            text, self.buffer = self.buffer, ""
+        return self.session.restore(text)
+
+    def flush(self) -> str:
+        text, self.buffer = self.buffer, ""
+        return self.session.restore(text)
+
+if __name__ == "__main__":
+    # Throughput benchmark: python -m services.pii_redactor
+    import time
+
+    sample = (
+        "আমার নাম করিম, মোবাইল ০১৭১২৩৪৫৬৭৮ এবং 01812-345678, NID 1234567890123, "
+        "পাসপোর্ট AB1234567, ইমেইল karim@example.com, বাসা নং ১২, রোড 5/A, ধানমন্ডি। "
+        "bKash TrxID: 8N7A6B5C4D দিয়ে টাকা পাঠিয়েছি কিন্তু বাড়িওয়ালা রসিদ দিচ্ছে না। "
+        "জমির দলিল নিয়ে প্রতিবেশীর সাথে বিরোধ চলছে, কোর্টে মামলা করতে চাই। "
+    )
+    clean = "জমির দলিল নিয়ে প্রতিবেশীর সাথে বিরোধ চলছে, কোর্টে মামলা করতে চাই। Landlord refuses to return the deposit. "
+
+    for label, text in (("with PII", sample * 2000), ("clean text", clean * 2000)):
+        size_mb = len(text.encode("utf-8")) / 1_000_000
+        rounds = 5
+        started = time.perf_counter()
+        for _ in range(rounds):
+            session = RedactionSession()
+            session.restore(session.redact(text))
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {size_mb * rounds / elapsed:.1f} MB/s redact+restore ({size_mb:.2f} MB x {rounds})")
@@ -0,0 +1,149 @@
+from core.config import settings
+from core.profiling import annotate
+from collections import Counter
+import re
+
+BENGALI_CHAR = re.compile(r"[ঀ-৿]")
+LATIN_CHAR = re.compile(r"[A-Za-z]")
+WORD = re.compile(r"[\wঀ-৿]+")
+# Long runs of one letter or digit; punctuation runs ("!!!!", "....") are ordinary emphasis
+REPEATED_CHAR = re.compile(r"([^\W_])\1{14,}")
+# Prose reuses a small alphabet, so the distinct-character ratio only means
+# keyboard mashing in short texts
+SHORT_TEXT_CHARS = 80
+
+# Common romanised Bengali words; enough of them in Latin text means Banglish
+BANGLISH_WORDS = {
+    "ami", "amar", "amake", "apni", "apnar", "tumi", "tomar", "se", "tar", "ki", "kivabe", "keno",
+    "kothay", "kobe", "koto", "ache", "nai", "na", "hobe", "korbo", "korte", "kore", "korse",
+    "dite", "dicche", "dise", "niye", "theke", "jonno", "sathe", "ekta", "onek", "khub", "ar",
+    "bhai", "vai", "apu", "jomi", "bari", "bariwala", "vara", "bhara", "beton", "talak", "biye",
+    "bou", "shami", "mamla", "thana", "adalot", "ain", "ukil", "taka", "chakri", "malik", "dokan"
+}
+
+LEGAL_KEYWORDS = {
+    # Bengali
+    "আইন", "আইনি", "মামলা", "আদালত", "কোর্ট", "থানা", "পুলিশ", "উকিল", "আইনজীবী", "অধিকার", "দলিল",
+    "জমি", "সম্পত্তি", "তালাক", "বিবাহ", "বিয়ে", "দেনমোহর", "ভরণপোষণ", "উত্তরাধিকার", "বেতন", "চাকরি",
+    "ভাড়া", "বাড়িওয়ালা", "প্রতারণা", "চুরি", "হয়রানি", "নির্যাতন", "অভিযোগ", "জিডি", "চুক্তি", "জামিন",
+    # English
+    "law", "legal", "court", "case", "police", "lawyer", "advocate", "rights", "right", "divorce",
+    "marriage", "land", "property", "deed", "salary", "wage", "rent", "tenant", "landlord", "contract",
+    "fraud", "complaint", "harassment", "bail", "inheritance", "maintenance", "dowry", "consumer",
+    # Banglish
+    "ain", "mamla", "adalot", "thana", "ukil", "jomi", "talak", "biye", "beton", "vara", "bhara",
+    "bariwala", "dolil", "odhikar", "protarona", "jamin"
+}
+
+BENGALI_LEGAL_KEYWORDS = [keyword for keyword in LEGAL_KEYWORDS if BENGALI_CHAR.match(keyword)]
+
+GREETINGS = {
+    "hi", "hello", "hey", "salam", "assalamualaikum", "thanks", "thank", "ok", "okay", "bye",
+    "হাই", "হ্যালো", "সালাম", "আসসালামু", "আলাইকুম", "ধন্যবাদ", "শুভ", "সকাল", "ঠিক", "আছে"
+}
+
+OFF_TOPIC_KEYWORDS = {
+    "recipe", "cricket", "football", "movie", "song", "weather", "joke", "poem", "homework", "python",
+    "javascript", "রান্না", "রেসিপি", "ক্রিকেট", "ফুটবল", "সিনেমা", "গান", "আবহাওয়া", "কৌতুক", "কবিতা"
+}
+
+# "What is the emergency number?" - both an emergency word and a contact word
+EMERGENCY_KEYWORDS = {"emergency", "helpline", "hotline", "জরুরি", "হেল্পলাইন", "হটলাইন"}
+CONTACT_KEYWORDS = {"number", "numbers", "contact", "phone", "call", "নম্বর", "নাম্বার", "যোগাযোগ", "ফোন"}
+
+LANGUAGE_INSTRUCTIONS = {
+    "bn": "উত্তর বাংলায় দিন।",
+    "en": "Please answer in English.",
+    "banglish": "The user wrote Bengali in Latin letters (Banglish); answer in simple Bengali script."
+}
+
+CANNED_RESPONSES = {
+    "spam": "দুঃখিত, আপনার বার্তাটি বোঝা যায়নি। অনুগ্রহ করে আপনার আইনি সমস্যাটি বিস্তারিত লিখুন। / Sorry, we could not understand your message. Please describe your legal problem.",
+    "greeting": "আসসালামু আলাইকুম! আমি বাংলাদেশ আইনি তথ্য সহায়ক। আপনার আইনি সমস্যাটি বিস্তারিত লিখুন। / Hello! I am the Bangladesh Legal Information Assistant. Please describe your legal problem.",
+    "out_of_scope": "দুঃখিত, আমি শুধুমাত্র বাংলাদেশের আইন সংক্রান্ত প্রশ্নের উত্তর দিতে পারি। / Sorry, I can only answer questions about Bangladesh law.",
+    "emergency_contacts": "জরুরি আইনি সহায়তা / Emergency legal help:\n- পুলিশ / Police: ৯৯৯\n- জাতীয় আইনি সহায়তা / National Legal Aid: ১৬১০৩\n- মহিলা হেল্পলাইন / Women helpline: ১০৯২১"
+}
+
+def detect_language(text: str) -> str:
+    """
+    'bn' for Bengali script, 'banglish' for romanised Bengali, otherwise 'en'
+    """
+    bengali = len(BENGALI_CHAR.findall(text))
+    latin = len(LATIN_CHAR.findall(text))
+    if bengali and bengali >= latin * 0.5:
+        return "bn"
+
+    words = [word.lower() for word in WORD.findall(text) if LATIN_CHAR.match(word)]
+    if words and sum(1 for word in words if word in BANGLISH_WORDS) / len(words) >= 0.2:
+        return "banglish"
+    return "en"
+
+def _is_spam(text: str, words: list) -> bool:
+    stripped = text.strip()
+    if 20 <= len(stripped) < SHORT_TEXT_CHARS and len(set(stripped)) / len(stripped) < 0.1:
+        return True
+    if REPEATED_CHAR.search(stripped):
+        return True
+    if len(words) >= 6 and Counter(words).most_common(1)[0][1] / len(words) > 0.5:
+        return True
+    return False
+
+class RequestGate:
+    """
+    Cheap checks that run before any upstream call: spam, greetings,
+    out-of-scope chatter and emergency-number questions get canned answers;
+    everything else goes to the model with a language hint.
+    """
+
+    def __init__(self):
+        self.checked = 0
+        self.avoided: Counter = Counter()
+        self.languages: Counter = Counter()
+
+    def check(self, text: str) -> dict:
+        language = detect_language(text)
+        words = [word.lower() for word in WORD.findall(text)]
+        word_set = set(words)
+        # Bengali keywords are matched as substrings to cover inflected forms (মামলার, আদালতে)
+        is_legal = bool(word_set & LEGAL_KEYWORDS) or any(keyword in text for keyword in BENGALI_LEGAL_KEYWORDS)
+
+        # A message with legal keywords is a real question, however it is typed
+        if not is_legal and _is_spam(text, words):
+            reason = "spam"
+        elif word_set and word_set <= GREETINGS:
+            reason = "greeting"
+        elif word_set & EMERGENCY_KEYWORDS and word_set & CONTACT_KEYWORDS and len(words) <= 12:
+            reason = "emergency_contacts"
+        elif not is_legal and word_set & OFF_TOPIC_KEYWORDS:
+            reason = "out_of_scope"
+        else:
+            reason = None
+
+        self.checked += 1
+        self.languages[language] += 1
+        if reason and settings.request_gate_enabled:
+            self.avoided[reason] += 1
+            annotate(language=language, gate=reason)
+            return {"action": "canned", "reason": reason, "language": language, "response": CANNED_RESPONSES[reason]}
+
+        annotate(language=language, gate="upstream")
+        return {"action": "upstream", "reason": None, "language": language, "response": None}
+
+    def with_language_hint(self, prompt: str, language: str) -> str:
+        """
+        Prompt variant for the detected language
+        """
+        return f"{prompt}\n\n{LANGUAGE_INSTRUCTIONS[language]}"
+
+    def stats(self) -> dict:
+        avoided = sum(self.avoided.values())
+        return {
+            "checked": self.checked,
+            "upstream_calls_avoided": avoided,
+            "avoided_ratio": round(avoided / self.checked, 3) if self.checked else 0.0,
+            "avoided_by_reason": dict(self.avoided),
+            "languages": dict(self.languages)
+        }
+
+# Global gate instance
+request_gate = RequestGate()
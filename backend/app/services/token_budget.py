@@ -0,0 +1,109 @@
+from core.config import settings
+from collections import deque
+from typing import Deque, Dict, List
+import math
+
+# problem_type is free text, so cap how many distributions we keep
+MAX_BUDGET_KEYS = 256
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class _BudgetStats:
+    def __init__(self, window: int):
+        self.lengths: Deque[int] = deque(maxlen=window)
+        self.calls = {"fixed": 0, "adaptive": 0}
+        self.latency = {"fixed": deque(maxlen=window), "adaptive": deque(maxlen=window)}
+        self.reserved_tokens = 0
+        self.fixed_budget_tokens = 0
+        self.truncations = 0
+        self.continuations = 0
+        self.ceiling = 0
+
+class TokenBudgetPredictor:
+    """
+    Learns completion-length distributions per endpoint/problem type and
+    sizes max_tokens to a high percentile instead of a fixed budget.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, _BudgetStats] = {}
+
+    def _stats_for(self, key: str) -> _BudgetStats:
+        if key not in self.stats:
+            self.stats[key] = _BudgetStats(settings.token_budget_window)
+        return self.stats[key]
+
+    def max_tokens_for(self, key: str, ceiling: int) -> int:
+        """
+        Predicted max_tokens for a key, never above the endpoint's fixed budget
+        """
+        stats = self.stats.get(key)
+        if stats is None or len(stats.lengths) < settings.token_budget_min_samples:
+            return ceiling
+
+        predicted = _percentile(sorted(stats.lengths), settings.token_budget_percentile)
+        predicted = math.ceil(predicted * settings.token_budget_headroom)
+        return max(settings.token_budget_floor, min(ceiling, predicted))
+
+    def record(self, key: str, completion_tokens: int, latency: float,
+               reserved: int, ceiling: int, continuations: int, adaptive: bool) -> None:
+        """
+        Record one finished generation; continuation calls are included in
+        completion_tokens and reserved
+        """
+        if key not in self.stats and len(self.stats) >= MAX_BUDGET_KEYS:
+            return
+
+        stats = self._stats_for(key)
+        mode = "adaptive" if adaptive else "fixed"
+
+        stats.lengths.append(completion_tokens)
+        stats.calls[mode] += 1
+        stats.latency[mode].append(latency)
+        stats.reserved_tokens += reserved
+        stats.fixed_budget_tokens += ceiling
+        stats.continuations += continuations
+        stats.ceiling = ceiling
+        if continuations:
+            stats.truncations += 1
+
+    def report(self) -> dict:
+        """
+        Token and latency comparison between fixed and adaptive budgets per key
+        """
+        report = {}
+        for key, stats in self.stats.items():
+            lengths = sorted(stats.lengths)
+            latency = {}
+            for mode, values in stats.latency.items():
+                ordered = sorted(values)
+                latency[mode] = {
+                    "calls": stats.calls[mode],
+                    "avg_seconds": round(sum(ordered) / len(ordered), 3) if ordered else None,
+                    "p95_seconds": round(_percentile(ordered, 0.95), 3) if ordered else None
+                }
+
+            report[key] = {
+                "samples": len(lengths),
+                "completion_tokens_p50": _percentile(lengths, 0.5),
+                "completion_tokens_p95": _percentile(lengths, 0.95),
+                "fixed_max_tokens": stats.ceiling,
+                "current_max_tokens": self.max_tokens_for(key, stats.ceiling),
+                "fixed_budget_tokens": stats.fixed_budget_tokens,
+                "reserved_tokens": stats.reserved_tokens,
+                "reserved_tokens_saved": stats.fixed_budget_tokens - stats.reserved_tokens,
+                "truncated_answers": stats.truncations,
+                "continuations": stats.continuations,
+                "latency": latency
+            }
+        return report
+
+# Global predictor instance
+token_budget = TokenBudgetPredictor()
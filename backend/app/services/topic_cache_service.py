@@ -0,0 +1,144 @@
+from core.config import settings
+from core.profiling import annotate
+from services.groq_service import groq_service
+from services.legal_catalog import catalogued_topics, normalize_topic
+from pathlib import Path
+from typing import Dict, Optional
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+# Precomputed answer kinds and the GroqService call that produces each one
+GENERATORS = {
+    "explain_law": groq_service.explain_bangladesh_law,
+    "legal_procedure": groq_service.get_legal_procedures,
+    "document_requirements": groq_service.get_document_requirements
+}
+
+class LegalTopicCache:
+    """
+    Precomputed answers for every catalogued legal topic.
+
+    A background job fills the cache at startup and regenerates entries by
+    age. It only calls Groq when no user request is in flight and spaces its
+    calls out, so user traffic keeps the rate budget.
+    """
+
+    def __init__(self):
+        self.topics = {normalize_topic(topic) for topic in catalogued_topics()}
+        self.entries: Dict[str, dict] = {}
+        self.path = Path(settings.topic_cache_path)
+        self.task: Optional[asyncio.Task] = None
+
+    def _version(self) -> str:
+        # Answers depend on the model and system prompt; changing either retires stored entries
+        fingerprint = f"{groq_service.model}\n{groq_service.system_prompt}"
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+    def _key(self, kind: str, topic: str) -> str:
+        return f"{self._version()}:{kind}:{normalize_topic(topic)}"
+
+    def is_catalogued(self, topic: str) -> bool:
+        return normalize_topic(topic) in self.topics
+
+    def get(self, kind: str, topic: str) -> Optional[dict]:
+        entry = self.entries.get(self._key(kind, topic))
+        if entry and time.time() - entry["created_at"] < settings.topic_cache_max_age_seconds:
+            return entry["result"]
+        return None
+
+    def put(self, kind: str, topic: str, result: dict) -> None:
+        # Only real answers; a failed call must not be served from the cache for days
+        if result.get("status") == "success" and not result.get("error") and self.is_catalogued(topic):
+            self.entries[self._key(kind, topic)] = {"result": result, "created_at": time.time()}
+
+    async def get_or_generate(self, kind: str, topic: str) -> dict:
+        """
+        Cached answer for catalogued topics, otherwise a live Groq call
+        """
+        cached = self.get(kind, topic)
+        if cached is not None:
+            annotate(cache="hit")
+            return cached
+
+        annotate(cache="miss" if self.is_catalogued(topic) else "bypass")
+        result = await GENERATORS[kind](topic)
+        self.put(kind, topic, result)
+        return result
+
+    def _is_due(self, kind: str, topic: str) -> bool:
+        entry = self.entries.get(self._key(kind, topic))
+        return entry is None or time.time() - entry["created_at"] >= settings.topic_cache_refresh_age_seconds
+
+    async def _wait_for_idle(self) -> None:
+        while groq_service.inflight > 0:
+            await asyncio.sleep(settings.topic_cache_idle_poll_seconds)
+
+    async def refresh_due(self) -> int:
+        """
+        Generate missing or aged entries one at a time; returns how many were refreshed
+        """
+        refreshed = 0
+        for topic in catalogued_topics():
+            for kind, generate in GENERATORS.items():
+                if not self._is_due(kind, topic):
+                    continue
+
+                await self._wait_for_idle()
+                result = await generate(topic)
+                self.put(kind, topic, result)
+                if result.get("status") == "success":
+                    refreshed += 1
+                await asyncio.sleep(settings.topic_cache_call_interval_seconds)
+
+        if refreshed:
+            await asyncio.to_thread(self._save)
+        return refreshed
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+            prefix = f"{self._version()}:"
+            self.entries = {key: entry for key, entry in entries.items() if key.startswith(prefix)}
+            print(f"📚 Loaded {len(self.entries)} precomputed legal answers ({len(entries) - len(self.entries)} stale dropped)")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load topic cache: {e}")
+
+    def _save(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                refreshed = await self.refresh_due()
+                if refreshed:
+                    print(f"📚 Precomputed {refreshed} legal topic answers")
+            except Exception as e:
+                print(f"⚠️  Topic cache refresh failed: {e}")
+            await asyncio.sleep(settings.topic_cache_check_interval_seconds)
+
+    def start(self) -> None:
+        """
+        Load stored answers and start the background precomputation job
+        """
+        self._load()
+        if settings.topic_cache_warm_enabled and self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+# Global cache instance
+topic_cache = LegalTopicCache()
@@ -0,0 +1,193 @@
+from core.config import settings
+from contextvars import ContextVar
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import sqlite3
+
+# Set per request by the API key dependency, read when usage is recorded
+current_client: ContextVar[Optional[str]] = ContextVar("current_client", default=None)
+current_endpoint: ContextVar[Optional[str]] = ContextVar("current_endpoint", default=None)
+
+# Usage recorded outside a request (e.g. background precomputation)
+SYSTEM_CLIENT = "__system__"
+
+def _sqlite_path(database_url: str) -> str:
+    return database_url.replace("sqlite:///", "", 1)
+
+class UsageAccountant:
+    """
+    Token accounting per API client, endpoint and model.
+
+    Counters live in memory and are flushed to SQLite periodically, so the
+    quota check at request time is a dictionary lookup and never touches disk.
+    """
+
+    def __init__(self):
+        self.db_path = _sqlite_path(settings.database_url)
+        # (day, client, endpoint, model) -> [requests, prompt_tokens, completion_tokens]
+        self.pending: Dict[Tuple[str, str, str, str], List[int]] = {}
+        self.day = date.today().isoformat()
+        self.month = self.day[:7]
+        self.daily_tokens: Dict[str, int] = {}
+        self.monthly_tokens: Dict[str, int] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def _roll_period(self) -> None:
+        today = date.today().isoformat()
+        if today != self.day:
+            self.day = today
+            self.daily_tokens = {}
+            if today[:7] != self.month:
+                self.month = today[:7]
+                self.monthly_tokens = {}
+
+    def _quota(self, client: str, period: str) -> int:
+        override = settings.api_key_quotas.get(client, {})
+        return override.get(period, getattr(settings, f"{period}_token_quota"))
+
+    def quota_exceeded(self, client: str) -> Optional[str]:
+        """
+        Name of the exhausted quota period for a client, if any
+        """
+        self._roll_period()
+        daily = self._quota(client, "daily")
+        if daily and self.daily_tokens.get(client, 0) >= daily:
+            return "daily"
+        monthly = self._quota(client, "monthly")
+        if monthly and self.monthly_tokens.get(client, 0) >= monthly:
+            return "monthly"
+        return None
+
+    def record(self, prompt_tokens: int, completion_tokens: int, model: str) -> None:
+        """
+        Attribute one upstream call to the client and endpoint of the current request
+        """
+        self._roll_period()
+        client = current_client.get() or SYSTEM_CLIENT
+        endpoint = current_endpoint.get() or "background"
+        total = prompt_tokens + completion_tokens
+
+        counters = self.pending.setdefault((self.day, client, endpoint, model), [0, 0, 0])
+        counters[0] += 1
+        counters[1] += prompt_tokens
+        counters[2] += completion_tokens
+        self.daily_tokens[client] = self.daily_tokens.get(client, 0) + total
+        self.monthly_tokens[client] = self.monthly_tokens.get(client, 0) + total
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS token_usage (
+                day TEXT NOT NULL,
+                client TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                model TEXT NOT NULL,
+                requests INTEGER NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                completion_tokens INTEGER NOT NULL,
+                PRIMARY KEY (day, client, endpoint, model)
+            )
+        """)
+        return connection
+
+    def _write(self, rows: List[tuple]) -> None:
+        with self._connect() as connection:
+            connection.executemany("""
+                INSERT INTO token_usage VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (day, client, endpoint, model) DO UPDATE SET
+                    requests = requests + excluded.requests,
+                    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                    completion_tokens = completion_tokens + excluded.completion_tokens
+            """, rows)
+        connection.close()
+
+    async def flush(self) -> None:
+        """
+        Move pending counters into SQLite
+        """
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        rows = [key + tuple(values) for key, values in pending.items()]
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception as e:
+            # Keep the counters for the next flush
+            for key, values in pending.items():
+                counters = self.pending.setdefault(key, [0, 0, 0])
+                for i, value in enumerate(values):
+                    counters[i] += value
+            print(f"⚠️  Token usage flush failed: {e}")
+
+    def _load_totals(self) -> None:
+        with self._connect() as connection:
+            for client, tokens in connection.execute(
+                "SELECT client, SUM(prompt_tokens + completion_tokens) FROM token_usage WHERE day = ? GROUP BY client",
+                (self.day,)
+            ):
+                self.daily_tokens[client] = tokens
+            for client, tokens in connection.execute(
+                "SELECT client, SUM(prompt_tokens + completion_tokens) FROM token_usage WHERE day LIKE ? GROUP BY client",
+                (f"{self.month}-%",)
+            ):
+                self.monthly_tokens[client] = tokens
+        connection.close()
+
+    def _query_report(self, client: str, since: str) -> List[dict]:
+        with self._connect() as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute("""
+                SELECT day, endpoint, model, requests, prompt_tokens, completion_tokens
+                FROM token_usage WHERE client = ? AND day >= ?
+                ORDER BY day DESC, endpoint, model
+            """, (client, since)).fetchall()
+        connection.close()
+        return [dict(row) for row in rows]
+
+    async def report(self, client: str, days: int = 30) -> dict:
+        """
+        Usage rows for a client over the last `days` days plus current quota state
+        """
+        await self.flush()
+        since = (date.today() - timedelta(days=days - 1)).isoformat()
+        rows = await asyncio.to_thread(self._query_report, client, since)
+        return {
+            "client": client,
+            "since": since,
+            "usage": rows,
+            "total_tokens": sum(row["prompt_tokens"] + row["completion_tokens"] for row in rows),
+            "today_tokens": self.daily_tokens.get(client, 0),
+            "month_tokens": self.monthly_tokens.get(client, 0),
+            "daily_quota": self._quota(client, "daily") or None,
+            "monthly_quota": self._quota(client, "monthly") or None
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.usage_flush_interval_seconds)
+            await self.flush()
+
+    async def start(self) -> None:
+        """
+        Load today's and this month's totals, then flush periodically
+        """
+        try:
+            await asyncio.to_thread(self._load_totals)
+        except Exception as e:
+            print(f"⚠️  Could not load token usage totals: {e}")
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+# Global accountant instance
+usage_service = UsageAccountant()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modules import each other as top-level packages (core, services), as in main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+# Services build their Groq clients at import time; tests never reach the API
+os.environ.setdefault("GROQ_API_KEY", "test")
@@ -0,0 +1,148 @@
+"""
+WebSocket chat soak test against a stubbed Groq stream.
+
+    cd backend
+    python tests/soak_ws.py --idle 2000 --active 500
+
+Serves the app under uvicorn in this process, opens the idle and streaming
+sockets from a child process and reports this worker's resident memory per
+idle and per streaming connection (Linux /proc). No request reaches Groq.
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+async def run_clients(args: argparse.Namespace) -> None:
+    import websockets
+
+    url = f"ws://127.0.0.1:{args.port}/api/v1/ai/ws"
+    frames = errors = 0
+
+    async def connect():
+        socket = await websockets.connect(url, open_timeout=60)
+        await socket.send(json.dumps({"type": "ping"}))
+        await socket.recv()
+        return socket
+
+    idle = await asyncio.gather(*(connect() for _ in range(args.idle)))
+    print(f"idle {len(idle)}", flush=True)
+
+    active = await asyncio.gather(*(connect() for _ in range(args.active)))
+
+    async def chat(socket, number: int) -> None:
+        nonlocal frames, errors
+        for round_number in range(args.rounds):
+            await socket.send(json.dumps({
+                "type": "chat",
+                "id": f"{number}-{round_number}",
+                "message": "My landlord refuses to return my security deposit. What can I do?"
+            }))
+            while True:
+                frame = json.loads(await socket.recv())
+                if frame["type"] == "token":
+                    frames += 1
+                elif frame["type"] == "error":
+                    errors += 1
+                    break
+                elif frame["type"] in ("done", "cancelled"):
+                    break
+
+    streams = [asyncio.create_task(chat(socket, i)) for i, socket in enumerate(active)]
+    await asyncio.sleep(args.chunks * args.chunk_delay / 2)
+    print("streaming", flush=True)
+    await asyncio.gather(*streams)
+    print(f"done {frames} {errors}", flush=True)
+
+    await asyncio.gather(*(socket.close() for socket in idle + active))
+
+async def serve(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    os.environ.setdefault("GROQ_API_KEY", "soak-test")
+    sys.path.insert(0, str(APP_DIR))
+    from core.config import settings
+    from services.groq_service import groq_service
+
+    # Stubbed upstream and no background jobs, so only the sockets are measured
+    settings.topic_cache_warm_enabled = False
+    settings.interaction_log_enabled = False
+
+    async def fake_stream(message: str, max_tokens=None):
+        for i in range(args.chunks):
+            await asyncio.sleep(args.chunk_delay)
+            yield f"token{i} "
+
+    groq_service.generate_streaming_response = fake_stream
+
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning", ws="websockets"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    baseline = rss_mb()
+    samples = {}
+    client = await asyncio.create_subprocess_exec(
+        sys.executable, __file__, "--client", *sys.argv[1:],
+        stdout=asyncio.subprocess.PIPE
+    )
+    started = time.perf_counter()
+    async for line in client.stdout:
+        phase, *values = line.decode().split()
+        samples[phase] = (rss_mb(), values)
+    await client.wait()
+    elapsed = time.perf_counter() - started
+
+    server.should_exit = True
+    await server_task
+
+    if "done" not in samples:
+        print(f"❌ Soak client exited early (code {client.returncode})")
+        return
+
+    idle_rss = samples["idle"][0]
+    streaming_rss = samples["streaming"][0]
+    frames, errors = samples["done"][1]
+    print(f"baseline RSS:        {baseline:8.1f} MB")
+    print(f"{args.idle} idle sockets:  {idle_rss:8.1f} MB  ({(idle_rss - baseline) * 1024 / max(args.idle, 1):.1f} KB/connection)")
+    print(f"+{args.active} streaming:   {streaming_rss:8.1f} MB  ({(streaming_rss - idle_rss) * 1024 / max(args.active, 1):.1f} KB/connection)")
+    print(f"after streams:       {samples['done'][0]:8.1f} MB")
+    print(f"token frames: {frames}, errors: {errors}, {elapsed:.1f}s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="WebSocket chat soak test against a stubbed upstream")
+    parser.add_argument("--idle", type=int, default=2000, help="Connections that only connect and ping")
+    parser.add_argument("--active", type=int, default=500, help="Connections that stream chats")
+    parser.add_argument("--rounds", type=int, default=3, help="Chats per active connection")
+    parser.add_argument("--chunks", type=int, default=100, help="Token frames per stubbed answer")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="Seconds between stubbed tokens")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--client", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Thousands of sockets need more descriptors than the usual soft limit
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+
+    if args.client:
+        asyncio.run(run_clients(args))
+    else:
+        asyncio.run(serve(args))
+
+if __name__ == "__main__":
+    main()
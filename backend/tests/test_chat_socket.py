@@ -0,0 +1,46 @@
+from services import chat_socket_service
+from services.chat_socket_service import ChatSocketSession
+import asyncio
+import json
+
+class StubSocket:
+    url = type("URL", (), {"path": "/api/v1/ai/ws"})()
+
+def _frames(session: ChatSocketSession) -> list:
+    frames = []
+    while not session.outbox.empty():
+        frames.append(session.outbox.get_nowait())
+    return frames
+
+def _chat(stream_id: str) -> str:
+    return json.dumps({"type": "chat", "id": stream_id, "message": "My landlord keeps my deposit, what does the law say?"})
+
+def test_cancel_before_start_frees_the_stream_id(monkeypatch):
+    async def fake_stream(message, max_tokens=None):
+        yield "answer"
+
+    monkeypatch.setattr(chat_socket_service.groq_service, "generate_streaming_response", fake_stream)
+    logged = []
+    monkeypatch.setattr(chat_socket_service, "log_interaction", lambda endpoint, status, timings: logged.append(status))
+
+    async def scenario():
+        session = ChatSocketSession(StubSocket())
+        # Chat and cancel handled back to back, before the stream task runs once
+        session._handle(_chat("c"))
+        session._handle(json.dumps({"type": "cancel", "id": "c"}))
+        # One loop step finishes the cancelled task, the next runs its done callback
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        first = _frames(session)
+        assert session.streams == {}
+
+        session._handle(_chat("c"))
+        await session.streams["c"]
+        await asyncio.sleep(0)
+        assert session.streams == {}
+        return first, _frames(session)
+
+    first, second = asyncio.run(scenario())
+    assert first == [{"type": "cancelled", "id": "c"}]
+    assert {"type": "done", "id": "c"} in second
+    assert logged == [499, 200]
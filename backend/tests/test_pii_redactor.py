@@ -0,0 +1,64 @@
+from services.pii_redactor import RedactionSession
+import pytest
+
+def _redacted(text: str) -> dict:
+    session = RedactionSession()
+    session.redact(text)
+    return session.originals
+
+@pytest.mark.parametrize("text, value", [
+    ("call me on 01712345678", "01712345678"),
+    ("call me on 01712-345678", "01712-345678"),
+    ("call me on +8801712345678", "+8801712345678"),
+    ("call me on +880 1712-345678", "+880 1712-345678"),
+    ("call me on 01712 345 678", "01712 345 678"),
+    ("বিকাশ নম্বর ০১৭১২৩৪৫৬৭৮", "০১৭১২৩৪৫৬৭৮"),
+])
+def test_phone_numbers(text, value):
+    assert _redacted(text) == {"[PHONE_1]": value}
+
+def test_email():
+    assert _redacted("mail karim@example.com today") == {"[EMAIL_1]": "karim@example.com"}
+
+def test_bkash_transaction_id():
+    assert _redacted("paid with TrxID: 8N7A6B5C4D") == {"[BKASH_TXN_1]": "TrxID: 8N7A6B5C4D"}
+
+@pytest.mark.parametrize("text, value", [
+    ("my NID 1234567890123", "1234567890123"),
+    ("smart card 12345678901234567", "12345678901234567"),
+    ("NID no: 1234567890", "NID no: 1234567890"),
+    ("জাতীয় পরিচয়পত্র নং ১২৩৪৫৬৭৮৯০", "জাতীয় পরিচয়পত্র নং ১২৩৪৫৬৭৮৯০"),
+])
+def test_nid_numbers(text, value):
+    assert _redacted(text) == {"[NID_1]": value}
+
+def test_ten_digit_amount_is_not_an_nid():
+    assert _redacted("the land sold for 1500000000 taka") == {}
+
+def test_passport():
+    assert _redacted("passport AB1234567 expired") == {"[PASSPORT_1]": "AB1234567"}
+
+@pytest.mark.parametrize("text, value", [
+    ("House 12/A, Dhanmondi", "House 12/A"),
+    ("বাসা নং ১২/এ, ধানমন্ডি", "বাসা নং ১২/এ"),
+])
+def test_addresses(text, value):
+    assert _redacted(text) == {"[ADDRESS_1]": value}
+
+def test_address_keyword_needs_word_start():
+    assert _redacted("goods kept in warehouse 3") == {}
+
+def test_restore_round_trip():
+    session = RedactionSession()
+    redacted = session.redact("Karim 01712345678 wrote to karim@example.com")
+    assert "01712345678" not in redacted
+    assert session.restore("Call [PHONE_1] or mail [EMAIL_1]") == "Call 01712345678 or mail karim@example.com"
+
+def test_stream_restorer_joins_split_placeholder():
+    session = RedactionSession()
+    session.redact("my number is 01712345678")
+    restorer = session.stream_restorer()
+    chunks = ["Call [PH", "ONE_", "1] now", " please"]
+    output = "".join(restorer.feed(chunk) for chunk in chunks) + restorer.flush()
+    assert output == "Call 01712345678 now please"
+    assert restorer.feed("Call [PH") == "Call "
@@ -0,0 +1,51 @@
+from services.request_gate import RequestGate
+
+LONG_ENGLISH_QUESTION = (
+    "My landlord in Mirpur is refusing to return the security deposit of two months rent "
+    "after I moved out of the flat last week. I gave him proper notice in writing, the flat "
+    "was handed back in good condition and he signed the handover note. Now he says he will "
+    "keep the money for painting. What can I do under Bangladesh law to get my deposit back?"
+)
+
+LONG_BENGALI_QUESTION = (
+    "আমি গত পাঁচ বছর ধরে একটি গার্মেন্টস কারখানায় চাকরি করছি। গত তিন মাস ধরে মালিক আমাদের বেতন দিচ্ছে না "
+    "এবং ওভারটাইমের টাকাও আটকে রেখেছে। আমরা কয়েকজন শ্রমিক মিলে অভিযোগ করতে চাইলে সুপারভাইজার চাকরি থেকে "
+    "বের করে দেওয়ার হুমকি দিচ্ছে। শ্রম আইন অনুযায়ী আমাদের কি অধিকার আছে, কোথায় অভিযোগ করতে হবে এবং কি কি "
+    "কাগজপত্র লাগবে? মামলা করলে কত সময় লাগতে পারে?"
+)
+
+def test_long_english_question_goes_upstream():
+    result = RequestGate().check(LONG_ENGLISH_QUESTION)
+    assert len(LONG_ENGLISH_QUESTION) > 300
+    assert result["action"] == "upstream"
+    assert result["language"] == "en"
+
+def test_long_bengali_question_goes_upstream():
+    result = RequestGate().check(LONG_BENGALI_QUESTION)
+    assert result["action"] == "upstream"
+    assert result["language"] == "bn"
+
+def test_repeated_long_question_goes_upstream():
+    # Pasting the same paragraph twice is still a real question
+    result = RequestGate().check(LONG_ENGLISH_QUESTION + " " + LONG_ENGLISH_QUESTION)
+    assert result["action"] == "upstream"
+
+def test_punctuated_legal_questions_go_upstream():
+    gate = RequestGate()
+    bengali = gate.check("আমার জমি দখল করেছে প্রতিবেশী, দয়া করে সাহায্য করুন!!!!!!!!!!!!!!!!")
+    english = gate.check("My landlord took my deposit. Help please ..................")
+    assert bengali["action"] == "upstream"
+    assert english["action"] == "upstream"
+
+def test_keyboard_mashing_is_spam():
+    gate = RequestGate()
+    assert gate.check("asasasasasasasasasasas")["reason"] == "spam"
+    assert gate.check("!!!!!!!!!!!!!!!!!!!!!!!!!")["reason"] == "spam"
+    assert gate.check("hmm aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")["reason"] == "spam"
+    assert gate.check("help help help help help help help")["reason"] == "spam"
+
+def test_greeting_and_off_topic_are_canned():
+    gate = RequestGate()
+    assert gate.check("Hello, thanks")["reason"] == "greeting"
+    assert gate.check("tell me a cricket joke")["reason"] == "out_of_scope"
+    assert gate.stats()["upstream_calls_avoided"] == 2